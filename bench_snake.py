@@ -0,0 +1,230 @@
+# bench_snake.py (render + logic benchmarks against an in-memory LED strip; no Pi needed)
+# Swaps `board` / `neopixel` for a recording strip (and tkinter for a stub where it is not
+# installed) before importing snakeGame, then drives the game through fixed scenarios and reports per-operation timings plus strip traffic.
+#
+#   python bench_snake.py                         # run and print
+#   python bench_snake.py --save bench_baseline.json
+#   python bench_snake.py --compare bench_baseline.json --threshold 25
+import argparse, json, os, random, statistics, sys, tempfile, time, types
+
+# --- in-memory stand-ins for the LED hardware ---
+class RecordingStrip:
+    def __init__(self, pin, n, pixel_order="GRBW", auto_write=False, brightness=1.0, **_kw):
+        self.n = n
+        self.bpp = len(pixel_order) if isinstance(pixel_order, str) else 4
+        self.brightness = brightness
+        self.auto_write = auto_write
+        self.buf = [(0,0,0,0)] * n
+        self.setitem_calls = 0
+        self.show_calls = 0
+        self.bytes_pushed = 0
+
+    def __len__(self): return self.n
+    def __getitem__(self, i): return self.buf[i]
+
+    def __setitem__(self, i, v):
+        self.setitem_calls += 1
+        if isinstance(i, slice): self.buf[i] = list(v)
+        else: self.buf[i] = v
+
+    def fill(self, color):
+        self.buf = [color] * self.n
+
+    def show(self):
+        self.show_calls += 1
+        self.bytes_pushed += self.n * self.bpp
+
+    def deinit(self): pass
+
+    def reset_counts(self):
+        self.setitem_calls = self.show_calls = self.bytes_pushed = 0
+
+def install_fake_hardware():
+    board = types.ModuleType("board")
+    for pin in ("D12", "D18", "D21", "D24"): setattr(board, pin, pin)
+    neopixel = types.ModuleType("neopixel")
+    neopixel.NeoPixel = RecordingStrip
+    neopixel.GRB, neopixel.GRBW, neopixel.RGB, neopixel.RGBW = "GRB", "GRBW", "RGB", "RGBW"
+    sys.modules["board"] = board
+    sys.modules["neopixel"] = neopixel
+
+def install_fake_tk():
+    # slim CI images often lack python3-tk; the benchmarks never open a window
+    try:
+        import tkinter   # noqa: F401
+    except ImportError:
+        tk = types.ModuleType("tkinter")
+        for name in ("Tk", "Button", "Toplevel", "Label", "Entry", "Checkbutton", "BooleanVar", "IntVar",
+                     "Spinbox", "Frame", "Scale", "StringVar", "Canvas"):
+            setattr(tk, name, type(name, (), {}))
+        tk.HORIZONTAL = "horizontal"
+        sys.modules["tkinter"] = tk
+
+install_fake_hardware()
+install_fake_tk()
+import snakeGame as sg   # noqa: E402  (needs the fake hardware installed first)
+from snake_scores import ScoreStore   # noqa: E402
+sg.init_leds()
+
+# keep benchmark games out of the real leaderboard and replay folder
+sg.record_replays = False
+sg.scores = ScoreStore(os.path.join(tempfile.mkdtemp(prefix="snake-bench-"), "highscores"))
+
+# --- scenario setup ---
+def hamiltonian_cycle(w, h):
+    # row 0 left->right, rows 1.. zig-zag over x >= 1, back up column 0 (w, h even)
+    path = [(x, 0) for x in range(w)]
+    for y in range(1, h):
+        xs = range(w - 1, 0, -1) if y % 2 else range(1, w)
+        path += [(x, y) for x in xs]
+    path += [(0, y) for y in range(h - 1, 0, -1)]
+    return [y * w + x for (x, y) in path]
+
+def dir_between(w, a, b):
+    ay, ax = divmod(a, w); by, bx = divmod(b, w)
+    delta = (bx - ax, by - ay)
+    for d in (sg.UP, sg.DOWN, sg.LEFT, sg.RIGHT):
+        if d == delta: return d
+    raise ValueError(delta)
+
+class Scenario:
+    def __init__(self, name, length=3, apples=1, rainbow=False, score_screen=False):
+        self.name, self.length, self.apples = name, length, apples
+        self.rainbow, self.score_screen = rainbow, score_screen
+
+    def setup(self, game):
+        random.seed(1234); game.rng.seed(1234)
+        game.reset()
+        sg.effects.clear()
+        game.rainbow = self.rainbow
+        game.walls_enabled = False
+        game.apples_total = self.apples
+        self.cycle = hamiltonian_cycle(game.w, game.h)
+        self.next_cell = [0] * len(self.cycle)
+        for i, c in enumerate(self.cycle): self.next_cell[c] = self.cycle[(i + 1) % len(self.cycle)]
+        self.pos = self.length - 1
+        game.foods.clear(); game.free.reset()
+        game._place_body([self.cycle[i] for i in range(self.pos, -1, -1)])
+        game._spawn_foods()
+        game.state = "running"
+        game.direction = game.pending = dir_between(game.w, self.cycle[self.pos - 1], self.cycle[self.pos])
+        if self.score_screen:
+            game.state = "game_over"
+            game.over_at = float("inf")   # hold the score screen for the whole run
+
+    def steer(self, game):
+        # follow the cycle so long snakes never collide; re-setup if an apple ended the run
+        if game.state != "running" and not self.score_screen:
+            self.setup(game)
+        head = game.body.head()
+        game.turn(dir_between(game.w, head, self.next_cell[head]))
+
+SCENARIOS = [
+    Scenario("short_snake", length=3),
+    Scenario("near_full", length=240, apples=0),
+    Scenario("rainbow", length=120, rainbow=True),
+    Scenario("multi_apples", length=20, apples=10),
+    Scenario("score_screen", length=180, score_screen=True),
+]
+
+# --- timing ---
+def timeit(fn, iters):
+    samples = []
+    for _ in range(iters):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    samples.sort()
+    return {
+        "mean_us": statistics.fmean(samples) * 1e6,
+        "p50_us": samples[len(samples) // 2] * 1e6,
+        "p95_us": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1e6,
+    }
+
+def bench_scenario(sc, iters):
+    game, strip = sg.game, sg.pixels
+    out = {}
+    sc.setup(game)
+
+    if not sc.score_screen:
+        def move():
+            sc.steer(game)
+            game._move()
+        out["move"] = timeit(move, iters)
+        sc.setup(game)
+
+        strip.reset_counts(); sg.frame.invalidate()
+        out["draw"] = timeit(game.draw, iters)
+
+    out["draw_number_centered"] = timeit(lambda: game._draw_number_centered(game.score(), game.col_score, True), iters)
+
+    sc.setup(game)
+    strip.reset_counts(); sg.frame.frames_pushed = sg.frame.frames_skipped = 0
+    def tick():
+        if not sc.score_screen: sc.steer(game)
+        game.tick()
+        sg.render_frame()
+    out["game_tick"] = timeit(tick, iters)
+    frames = max(1, sg.frame.frames_pushed + sg.frame.frames_skipped)
+    out["strip"] = {
+        "setitem_per_frame": strip.setitem_calls / frames,
+        "show_per_frame": strip.show_calls / frames,
+        "bytes_per_frame": strip.bytes_pushed / frames,
+        "frames_skipped_pct": 100.0 * sg.frame.frames_skipped / frames,
+    }
+    return out
+
+def run(iters):
+    results = {"wheel": timeit(lambda: [sg.wheel(i) for i in range(256)], max(1, iters // 10))}
+    for sc in SCENARIOS:
+        results[sc.name] = bench_scenario(sc, iters)
+    return results
+
+# --- reporting / baseline ---
+def flatten(results, prefix=""):
+    for k, v in results.items():
+        if isinstance(v, dict) and "mean_us" not in v:
+            yield from flatten(v, f"{prefix}{k}.")
+        else:
+            yield f"{prefix}{k}", v
+
+def report(results):
+    for key, v in flatten(results):
+        if isinstance(v, dict):
+            print(f"{key:40s} mean {v['mean_us']:9.1f} us   p50 {v['p50_us']:9.1f}   p95 {v['p95_us']:9.1f}")
+        else:
+            print(f"{key:40s} {v:12.1f}")
+
+def compare(results, baseline, threshold):
+    base = dict(flatten(baseline))
+    regressions = []
+    for key, v in flatten(results):
+        if not isinstance(v, dict) or key not in base: continue
+        old = base[key]["mean_us"]
+        if old <= 0: continue
+        change = (v["mean_us"] - old) / old * 100
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{key:40s} {old:9.1f} -> {v['mean_us']:9.1f} us  ({change:+6.1f}%){flag}")
+        if flag: regressions.append(key)
+    return regressions
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark Snake logic and LED render paths")
+    ap.add_argument("--iters", type=int, default=2000)
+    ap.add_argument("--save", metavar="FILE", help="write results as a JSON baseline")
+    ap.add_argument("--compare", metavar="FILE", help="compare against a JSON baseline")
+    ap.add_argument("--threshold", type=float, default=25.0, help="regression threshold in percent")
+    args = ap.parse_args()
+
+    results = run(args.iters)
+    report(results)
+    if args.save:
+        with open(args.save, "w") as f: json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f: baseline = json.load(f)
+        print()
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,147 @@
 # snake_16x16_gui.py (v9.1 single-game Snake: score screen + stable physical reset)
-import time, random
-import board, neopixel
+import time
+BOOT_T0 = time.monotonic()   # start-up timing is measured from here (see BootTimer)
+import os, sys, random, threading, argparse
+from array import array
+from collections import deque
+from functools import lru_cache
 from tkinter import (
     Tk, Button as TkButton, Toplevel, Label, Entry, Button,
-    Checkbutton, BooleanVar, IntVar, Spinbox, Frame, Scale, HORIZONTAL, StringVar
+    Checkbutton, BooleanVar, IntVar, Spinbox, Frame, Scale, HORIZONTAL, StringVar, Canvas
 )
-from tkinter import ttk
+from snake_core import SnakeEngine, MultiSnakeEngine, UP, DOWN, LEFT, RIGHT
+from snake_metrics import Metrics
+from snake_autopilot import Autopilot
+from snake_replay import Replay, ReplayPlayer, ReplayRecorder, prune as prune_replays, save as save_replay
+from snake_scores import ScoreStore
+from snake_panels import Panel, PanelLayout, tiled, parse_tiling
+from snake_leddriver import scale_rgbw, strip_writer
+# board/neopixel (or the LED driver process) load in init_leds(), gpiozero in setup_gpio(), the
+# metrics server, spectator stream and profiler when they start, ttk and colorchooser when the
+# admin window opens: none of them stand between power-on and the first lit frame
+
+# --- start-up timing: checkpoints from process start to the first playable tick ---
+def _process_age():
+    # seconds since the kernel started this process (Linux); None where /proc is missing
+    try:
+        with open("/proc/self/stat") as f: start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f: uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except Exception:
+        return None
+
+class BootTimer:
+    def __init__(self, t0):
+        self.t0 = t0
+        age = _process_age()
+        # interpreter start-up before the first line of this module ran
+        self.pre = max(0.0, age - (time.monotonic() - t0)) if age is not None else 0.0
+        self.marks = []
+
+    def mark(self, stage):
+        self.marks.append((stage, time.monotonic() - self.t0))
+
+    def since(self, stage):
+        # seconds from process start to the end of stage (None if not reached yet)
+        for name, t in self.marks:
+            if name == stage: return self.pre + t
+        return None
+
+    def summary(self):
+        parts = [f"interpreter {self.pre:.2f}s"] if self.pre else []
+        last = 0.0
+        for stage, t in self.marks:
+            parts.append(f"{stage} {t - last:.2f}s")
+            last = t
+        end = self.marks[-1][0] if self.marks else "start"
+        return f"boot: {', '.join(parts)} -> {end} at {self.pre + last:.2f}s"
+
+boot = BootTimer(BOOT_T0)
+boot.mark("imports")
 
 # Optional physical buttons
-USE_GPIO = True
-try:
-    from gpiozero import Button as GpioButton
-except Exception:
-    USE_GPIO = False
+USE_GPIO = True   # False skips gpiozero entirely (desk testing)
 
 # --- LED matrix config ---
-W, H = 16, 16
-N = W * H
-PIN = board.D24          # LED data on GPIO24
+# PANELS describes the wall: one entry per panel with its grid position, rotation, wiring and
+# data pin (None = PIN; panels on the same pin are chained in list order). SNAKE_PANELS="2x2"
+# tiles identical 16x16 panels on one chain instead. W, H and every lookup follow from it.
+PIN = "D24"              # LED data on GPIO24 (a board pin name)
 BRIGHTNESS = 0.15
-ORDER = neopixel.GRBW
-pixels = neopixel.NeoPixel(PIN, N, pixel_order=ORDER, auto_write=False, brightness=BRIGHTNESS)
+GAMMA = 1.0              # 2.2-2.8 evens out fades; 1.0 keeps the original linear look
+CHANNEL_GAINS = (1.0, 1.0, 1.0, 1.0)   # R, G, B, W white balance
+ORDER = "GRBW"           # neopixel.GRBW
+PANELS = [Panel(0, 0, 16, 16)]   # serpentine rows, origin top-left
+if os.environ.get("SNAKE_PANELS"): PANELS = tiled(*parse_tiling(os.environ["SNAKE_PANELS"]))
+layout = PanelLayout(PANELS, default_pin=PIN)
+W, H = layout.w, layout.h
+N = W * H
 
-def idx(x, y):
-    # serpentine rows, origin top-left
-    if y % 2 == 0: return y * W + x
-    return y * W + (W - 1 - x)
+class SoftStrip:
+    # software display backend: used when board/neopixel or the strip itself is unavailable,
+    # so the game, GUI and metrics still run (the pixels just live in memory)
+    def __init__(self, n, brightness=1.0):
+        self.n = n
+        self.brightness = brightness
+        self.buf = [(0,0,0,0)] * n
+        self.shows = 0
+
+    def __len__(self): return self.n
+    def __getitem__(self, i): return self.buf[i]
+
+    def __setitem__(self, i, v):
+        if isinstance(i, slice): self.buf[i] = list(v)
+        else: self.buf[i] = v
+
+    def fill(self, color): self.buf = [color] * self.n
+    def show(self): self.shows += 1
+    def deinit(self): pass
+
+board = neopixel = None
+LED_PROCESS = False      # True: a separate process owns the strips (snake_leddriver)
+led_backend = None       # "neopixel", "software" or "driver process", set by init_leds()
+driver = None            # DriverLink when LED_PROCESS is on
+outputs = []             # (strip, first pixel, pixel count) per data pin, in frame order
+strips = []
+pixels = None            # first strip
+
+def _make_strip(pin, count):
+    if neopixel is None: return SoftStrip(count)
+    try:
+        return neopixel.NeoPixel(getattr(board, pin) if isinstance(pin, str) else pin, count,
+                                 pixel_order=ORDER, auto_write=False, brightness=1.0)   # the LUT scales
+    except Exception as e:
+        print(f"LED output {pin} unavailable ({e}); using the software display")
+        return SoftStrip(count)
+
+def init_leds(process=False):
+    # first thing main() does, so a boot frame is lit before Tk or GPIO start
+    global board, neopixel, led_backend, pixels, driver
+    if strips: return
+    if process:
+        # the driver process imports board/neopixel and owns the strips; here it is one "strip"
+        from snake_leddriver import DriverLink
+        driver = DriverLink(N, [(pin, first, count) for pin, first, count, _chain in layout.outputs], ORDER)
+        outputs[:] = [(driver, 0, N)]
+        strips[:] = [driver]
+        pixels = driver
+        led_backend = "driver process"
+        frame.attach(outputs)
+        metrics.gauge("snake_driver_dropped_frames", "Frames the LED driver process skipped as superseded",
+                      lambda: driver.stats()["dropped"])
+        metrics.gauge("snake_driver_late_frames", "LED driver pushes that overran their slot",
+                      lambda: driver.stats()["late"])
+        return
+    try:
+        import board, neopixel
+    except Exception as e:   # not on a Pi, or the driver is missing: degrade, don't die
+        print(f"LED driver unavailable ({e}); using the software display")
+        board = neopixel = None
+    outputs[:] = [(_make_strip(pin, count), first, count) for pin, first, count, _chain in layout.outputs]
+    strips[:] = [s for s, _first, _count in outputs]
+    pixels = strips[0]
+    led_backend = "software" if all(isinstance(s, SoftStrip) for s in strips) else "neopixel"
+    frame.attach(outputs)
 
 def clamp255(v): return max(0, min(255, int(v)))
 
@@ -40,16 +156,31 @@ def wheel(pos):
 BLACK = (0,0,0,0)
 LOW_WHITE = (0,0,0,60)  # round end flash
 LOW_RED   = (40,0,0,0)  # death flash
+RAINBOW = [bytes(wheel((i*12) & 255)) for i in range(64)]   # segment i uses RAINBOW[i & 63]
+
+# --- color pipeline: brightness + gamma baked into one 256-entry table per channel ---
+# Strips run at brightness 1.0 and get finished bytes; a frame is scaled with four
+# bytes.translate calls instead of the driver's float multiply per channel per pixel.
+class ColorLUT:
+    def __init__(self, brightness=BRIGHTNESS, gamma=GAMMA, gains=CHANNEL_GAINS):
+        self.gamma, self.gains = gamma, tuple(gains)
+        self.set_brightness(brightness)
+
+    def set_brightness(self, b):
+        self.brightness = b
+        self.tables = [bytes(min(255, int((v / 255) ** self.gamma * 255 * b * g + 1e-9)) for v in range(256))
+                       for g in self.gains]
+        self.identity = all(t == _IDENTITY for t in self.tables)
 
-# Directions per requested mapping
-UP, DOWN = (0,-1), (0,1)
-LEFT, RIGHT = (1,0), (-1,0)
+    def apply(self, src):
+        # RGBW bytes -> scaled RGBW bytes
+        return src if self.identity else scale_rgbw(src, self.tables)
 
-# --- GUI root / kiosk ---
-root = Tk()
-root.title("Snake")
-root.geometry("520x640")
-root.attributes("-fullscreen", True)   # kiosk start
+_IDENTITY = bytes(range(256))
+lut = ColorLUT()
+
+# --- GUI root / kiosk (built by build_gui(), so the module imports without a display) ---
+root = None
 
 TOPLEVELS = set()
 def _track(win):
@@ -68,7 +199,7 @@ def minimize_all():
         except: pass
 
 def set_fullscreen(val: bool):
-    fullscreen_var.set(bool(val))
+    if fullscreen_var is not None: fullscreen_var.set(bool(val))
     try:
         root.attributes("-fullscreen", bool(val))
     except Exception:
@@ -78,15 +209,397 @@ def exit_fullscreen_and_minimize():
     set_fullscreen(False)
     minimize_all()
 
+# --- metrics: stage timers, counters, input-to-LED latency (Prometheus on METRICS_PORT) ---
+METRICS_PORT = 9108   # 127.0.0.1 only; 0 disables the endpoint
+metrics = Metrics()
+metrics.histogram("snake_game_tick_seconds", "Whole game_tick callback")
+metrics.histogram("snake_logic_tick_seconds", "GameSnake.tick() per logic step")
+metrics.histogram("snake_render_seconds", "Frame build + push (render_frame, includes show)")
+metrics.histogram("snake_led_show_seconds", "Copying a frame to the strips + strip.show()")
+metrics.histogram("snake_input_to_led_seconds", "Input event to the first pushed frame after it")
+for _name, _help in (("snake_deaths_total", "Games ended by a crash"),
+                     ("snake_round_ends_total", "Games ended by the timer or a full board"),
+                     ("snake_resets_total", "Returns to the start screen"),
+                     ("snake_combo_resets_total", "Up+down button combo resets"),
+                     ("snake_inputs_total", "Direction inputs received")):
+    metrics.counter(_name, _help)
+_input_waiting_since = None   # oldest accepted input not yet reflected in a pushed frame
+
+def input_accepted(t):
+    # call before acting on an input that changes the game; the next push ends its latency sample
+    global _input_waiting_since
+    if _input_waiting_since is None: _input_waiting_since = t
+
+# --- on-demand profiling: sample every thread for a while, save collapsed stacks (snake_profiler) ---
+PROFILE_SECONDS = 30
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+profiler = None           # SamplingProfiler, made by the first start_profile()
+
+def start_profile():
+    # F9 or Admin > Diagnostics; again while running ends the capture early.
+    # The file is written by the profiler thread when it ends.
+    global profiler
+    if profiler is None:
+        from snake_profiler import SamplingProfiler
+        profiler = SamplingProfiler()
+    if profiler.running:
+        profiler.stop()
+        print("profile stopped early"); return
+    if profiler.start(PROFILE_SECONDS, PROFILE_DIR):
+        print(f"profiling all threads for {PROFILE_SECONDS}s")
+
+# --- spectator stream: pushed frames go out as UDP keyframes + deltas (snake_stream) ---
+STREAM_PORT = 0   # e.g. 9109 to let lobby displays and recorders on the LAN subscribe; 0 = off
+stream = None
+
+def start_stream(port):
+    global stream
+    if not port: return
+    from snake_stream import StreamPublisher
+    try:
+        stream = StreamPublisher(W, H, XY_TABLE, port)
+    except (OSError, ValueError) as e:
+        print(f"spectator stream disabled: {e}")
+
+# --- frame pipeline: build a frame, push it only if it differs from the last one sent ---
+# Frame is a flat RGBW bytearray holding every output back to back; (x, y) -> pixel offset comes
+# from XY_TABLE (compiled from the panel layout), so drawing never redoes the panel math. Each
+# output gets one slice write, and only when its part of the frame changed.
+XY_TABLE = layout.compile()   # cell = y * W + x
+BPP = 4
+
+def _strip_writer(strip):
+    # write(frame, a, b): scale frame[a:b] (RGBW) through the LUT into strip, unpushed
+    if strip is driver:
+        return lambda src, a, b: strip.write_frame(lut.apply(src[a:b]))
+    return strip_writer(strip, lambda: None if lut.identity else lut.tables)
+
+class FrameBuffer:
+    def __init__(self, outputs, n):
+        self.attach(outputs)
+        self.n = n
+        self.buf = bytearray(n * BPP)
+        self._blank = bytes(n * BPP)
+        self._last = None           # last frame actually pushed to the strips (None = push next)
+        self.frames_pushed = 0
+        self.frames_skipped = 0
+        self.on_push = None         # called with the buffer after every push, whoever called show()
+
+    def fill(self, color):
+        if color == BLACK: self.buf[:] = self._blank
+        else: self.buf[:] = bytes(color) * self.n
+
+    def put(self, x, y, color):
+        o = XY_TABLE[y * W + x] * BPP
+        self.buf[o:o+BPP] = color
+
+    def put_cell(self, cell, color):
+        o = XY_TABLE[cell] * BPP
+        self.buf[o:o+BPP] = color
+
+    def show(self, force=False):
+        buf, last = self.buf, self._last
+        if not force and buf == last:
+            self.frames_skipped += 1
+            return False
+        t0 = time.perf_counter()
+        for strip, a, b, write in self.outputs:
+            if force or last is None or buf[a:b] != last[a:b]:
+                write(buf, a, b)
+                strip.show()
+        metrics.observe("snake_led_show_seconds", time.perf_counter() - t0)
+        self._last = bytes(buf)
+        self.frames_pushed += 1
+        if self.on_push is not None: self.on_push(self)
+        return True
+
+    def attach(self, outputs):
+        # (strip, first pixel, pixel count) per output; none = an offscreen frame
+        self.outputs = [(strip, first * BPP, (first + count) * BPP, _strip_writer(strip))
+                        for strip, first, count in outputs]
+        self._last = None
+
+    def blit(self, data):
+        # replace the whole frame with a prebuilt one (same size, frame order)
+        self.buf[:] = data
+
+    def invalidate(self):
+        # strips were written behind our back (or the LUT changed); next show() must push
+        self._last = None
+
+frame = FrameBuffer(outputs, N)
+
+# --- 3x5 font, compiled once: bit (y * 3 + x) of a glyph mask is lit ---
+FONT_ROWS = {
+    '0': ["111","101","101","101","111"],
+    '1': ["010","110","010","010","111"],
+    '2': ["111","001","111","100","111"],
+    '3': ["111","001","111","001","111"],
+    '4': ["101","101","111","001","001"],
+    '5': ["111","100","111","001","111"],
+    '6': ["111","100","111","101","111"],
+    '7': ["111","001","001","010","010"],
+    '8': ["111","101","111","101","111"],
+    '9': ["111","101","111","001","111"],
+    'A': ["010","101","111","101","101"],
+    'B': ["110","101","110","101","110"],
+    'C': ["011","100","100","100","011"],
+    'D': ["110","101","101","101","110"],
+    'E': ["111","100","110","100","111"],
+    'F': ["111","100","110","100","100"],
+    'G': ["011","100","101","101","011"],
+    'H': ["101","101","111","101","101"],
+    'I': ["111","010","010","010","111"],
+    'J': ["001","001","001","101","010"],
+    'K': ["101","101","110","101","101"],
+    'L': ["100","100","100","100","111"],
+    'M': ["101","111","101","101","101"],
+    'N': ["110","101","101","101","101"],
+    'O': ["010","101","101","101","010"],
+    'P': ["110","101","110","100","100"],
+    'Q': ["010","101","101","110","011"],
+    'R': ["110","101","110","101","101"],
+    'S': ["011","100","010","001","110"],
+    'T': ["111","010","010","010","010"],
+    'U': ["101","101","101","101","111"],
+    'V': ["101","101","101","101","010"],
+    'W': ["101","101","101","111","101"],
+    'X': ["101","101","010","101","101"],
+    'Y': ["101","101","010","010","010"],
+    'Z': ["111","001","010","100","111"],
+    ' ': ["000","000","000","000","000"],
+    '!': ["010","010","010","000","010"],
+    '-': ["000","000","111","000","000"],
+    ':': ["000","010","000","010","000"],
+    '.': ["000","000","000","000","010"],
+}
+GLYPH_W, GLYPH_H = 3, 5
+
+def compile_glyph(rows):
+    mask = 0
+    for y, row in enumerate(rows):
+        for x, c in enumerate(row):
+            if c == '1': mask |= 1 << (y * GLYPH_W + x)
+    return mask
+
+FONT = {ch: compile_glyph(rows) for ch, rows in FONT_ROWS.items()}
+# lit (x, y) offsets per glyph, plain and X-mirrored, so painting never touches the masks
+GLYPH_CELLS = {}
+for _ch, _mask in FONT.items():
+    _lit = [(i % GLYPH_W, i // GLYPH_W) for i in range(GLYPH_W * GLYPH_H) if _mask >> i & 1]
+    GLYPH_CELLS[_ch, False] = tuple(_lit)
+    GLYPH_CELLS[_ch, True] = tuple((GLYPH_W - 1 - x, y) for (x, y) in _lit)
+
+def text_width(s):
+    return len(s) * (GLYPH_W + 1) - 1   # 3px glyph + 1px space
+
+def paint_text(fb, s, ox, oy, color, mirror_x=False):
+    # X-mirror also reverses character order so the text reads right through the mirror
+    seq = s[::-1] if mirror_x else s
+    put = fb.put
+    for i, ch in enumerate(seq):
+        gx = ox + i * (GLYPH_W + 1)
+        for (x, y) in GLYPH_CELLS.get((ch, mirror_x), ()):
+            px, py = gx + x, oy + y
+            if 0 <= px < W and 0 <= py < H:
+                put(px, py, color)
+
+# Fully rendered centered text frames, keyed by (text, color, mirror_x): the score screen is one blit
+@lru_cache(maxsize=16)
+def text_frame(s, color, mirror_x=False):
+    fb = FrameBuffer((), N)
+    ox = max(0, (W - text_width(s)) // 2)
+    oy = max(0, (H - GLYPH_H) // 2)
+    paint_text(fb, s, ox, oy, color, mirror_x)
+    return bytes(fb.buf)
+
+# --- marquee: text wider than the board scrolls right to left ---
+MARQUEE_SPEED = 10    # columns per second
+
+# glyph columns as masks (bit y lit), the unit a marquee is built from
+GLYPH_COLS = {ch: tuple(sum(1 << y for y in range(GLYPH_H) if mask >> (y * GLYPH_W + x) & 1)
+                        for x in range(GLYPH_W))
+              for ch, mask in FONT.items()}
+
+class Marquee:
+    # The message is rendered once into a column strip (W blank columns either side, so it
+    # scrolls in from one edge and out the other). Each scroll position becomes a full frame
+    # the first time it is shown; after that a frame is one blit, like text_frame.
+    def __init__(self, text, color, mirror_x=False, speed=MARQUEE_SPEED):
+        cols = [0] * W
+        for i, ch in enumerate(text.upper()):
+            if i: cols.append(0)
+            cols.extend(GLYPH_COLS.get(ch, GLYPH_COLS[' ']))
+        cols.extend([0] * W)
+        self.cols = cols
+        self.color, self.mirror_x, self.speed = color, mirror_x, speed
+        self.positions = len(cols) - W + 1
+        self.duration = self.positions / speed     # one full pass, in seconds
+        self._frames = [None] * self.positions
+
+    def frame(self, t):
+        # the frame t seconds after the marquee started; loops after each pass
+        i = int(t * self.speed) % self.positions
+        f = self._frames[i]
+        if f is None: f = self._frames[i] = self._render(i)
+        return f
+
+    def _render(self, i):
+        fb = FrameBuffer((), N)
+        put = fb.put
+        oy = max(0, (H - GLYPH_H) // 2)
+        for v in range(W):
+            m = self.cols[i + v]
+            if not m: continue
+            # mirrored boards read from high x to low x, like paint_text(mirror_x=True)
+            x = W - 1 - v if self.mirror_x else v
+            for y in range(min(GLYPH_H, H)):
+                if m >> y & 1: put(x, oy + y, self.color)
+        return bytes(fb.buf)
+
+@lru_cache(maxsize=8)
+def marquee(text, color, mirror_x=False):
+    return Marquee(text, color, mirror_x)
+
+def status_frame(text, color, t, mirror_x=False):
+    # centered if it fits, otherwise scrolling; t = seconds the screen has been up
+    if text_width(text) <= W: return text_frame(text, color, mirror_x)
+    return marquee(text, color, mirror_x).frame(t)
+
+def status_seconds(text, color, mirror_x=False):
+    # how long the screen needs to be held for one complete read
+    return 0 if text_width(text) <= W else marquee(text, color, mirror_x).duration
+
+# Party score screen: each player's score in their color, stacked (2 players) or in quadrants
+@lru_cache(maxsize=16)
+def party_score_frame(points, colors, mirror_x=False):
+    fb = FrameBuffer((), N)
+    cols = 1 if len(points) <= 2 else 2
+    rows = -(-len(points) // cols)
+    cw, ch = W // cols, H // rows
+    for k, (n, color) in enumerate(zip(points, colors)):
+        r, c = divmod(k, cols)
+        if mirror_x: c = cols - 1 - c
+        txt = str(n)
+        ox = c * cw + max(0, (cw - text_width(txt)) // 2)
+        oy = r * ch + max(0, (ch - GLYPH_H) // 2)
+        paint_text(fb, txt, ox, oy, color, mirror_x)
+    return bytes(fb.buf)
+
+# --- effects: timed LED animations, advanced one step per frame by game_tick (never sleeps) ---
+# An effect is a list of keyframes (duration_s, paint); paint(fb, t) draws the frame for
+# progress t in [0, 1) through that keyframe. Effects queue up and play back to back.
+class Effects:
+    def __init__(self):
+        self.queue = deque()
+        self._keys = None
+        self._key_i = 0
+        self._key_started = 0.0
+
+    def play(self, keyframes):
+        self.queue.append(list(keyframes))
+
+    def clear(self):
+        self.queue.clear()
+        self._keys = None
+
+    def active(self):
+        return self._keys is not None or bool(self.queue)
+
+    def render(self, fb, now=None):
+        # paint the current keyframe into fb; False when nothing is playing
+        if now is None: now = time.monotonic()
+        while True:
+            if self._keys is None:
+                if not self.queue: return False
+                self._keys = self.queue.popleft()
+                self._key_i = 0
+                self._key_started = now
+            if self._key_i >= len(self._keys):
+                self._keys = None
+                continue
+            dur, paint = self._keys[self._key_i]
+            elapsed = now - self._key_started
+            if elapsed >= dur:
+                self._key_i += 1
+                self._key_started += dur
+                if now - self._key_started > 1.0: self._key_started = now  # don't replay a long stall
+                continue
+            paint(fb, elapsed / dur if dur > 0 else 1.0)
+            return True
+
+effects = Effects()
+
+def solid(color):
+    return lambda fb, t: fb.fill(color)
+
+def flash_keys(color, times=2, dur=0.12):
+    return [(dur, solid(color)), (dur, solid(BLACK))] * times
+
+def reveal_keys(paint_target, dur=0.4):
+    # wipe paint_target in column by column, left to right
+    def paint(fb, t):
+        paint_target(fb)
+        cols = int(t * W) + 1
+        for x in range(cols, W):
+            for y in range(H): fb.put(x, y, BLACK)
+    return [(dur, paint)]
+
 # --- helpers ---
 def flash(color, times=2, dur=0.12):
-    for _ in range(times):
-        pixels.fill(color); pixels.show(); time.sleep(dur)
-        pixels.fill(BLACK); pixels.show(); time.sleep(dur)
+    effects.play(flash_keys(color, times, dur))
+
+# --- input: every source enqueues timestamped events; only the Tk thread applies them ---
+# gpiozero calls back from its own thread, so it must never touch game state or the LEDs.
+class InputQueue:
+    def __init__(self, maxlen=64):
+        self._q = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.last_at = 0.0     # time of the newest event (the idle check reads it without draining)
+
+    def push(self, d, source, player=0):
+        with self._lock:
+            self.last_at = time.monotonic()
+            self._q.append((self.last_at, source, d, player))
+
+    def drain(self):
+        with self._lock:
+            events = list(self._q)
+            self._q.clear()
+        return events
+
+inputs = InputQueue()
 
 # --- scoreboard + high score ---
 SCORE_HOLD_SECONDS = 5
-high_score = 0
+# persisted as a journal + snapshot (snake_scores); loading is a couple of small reads
+SCORES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scores", "highscores")
+scores = ScoreStore(SCORES_PATH)
+high_score = scores.high_score
+
+# --- attract mode: the game plays itself after ATTRACT_AFTER idle seconds at the start screen ---
+attract_enabled = True
+ATTRACT_AFTER = 20            # seconds in waiting_start before the demo starts
+DEMO_RESTART_PAUSE = 2        # seconds on the start screen between demo games
+DEMO_MAX_TICKS = 3000         # end a demo that has settled into circling
+AUTOPILOT_BUDGET = 0.25       # fraction of TICK the planner may spend per step
+autopilot = Autopilot()
+
+# --- replay logs: seed + settings + accepted turns per run, written after the run ends ---
+record_replays = True
+REPLAY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "replays")
+REPLAY_KEEP = 1000    # newest logs kept on the SD card; older ones are deleted as new ones land
+recorder = ReplayRecorder()
+
+def _write_replay(data, score):
+    try: save_replay(data, REPLAY_DIR, score)
+    except OSError as e: print(f"replay not saved: {e}"); return
+    prune_replays(REPLAY_DIR, REPLAY_KEEP)
+
+def store_replay(eng):
+    data = recorder.finish(eng)
+    if data:  # off the Tk thread; the SD card can stall
+        threading.Thread(target=_write_replay, args=(data, eng.score()), daemon=True).start()
 
 # --- timer (optional rounds) ---
 timed_mode = False
@@ -103,9 +616,62 @@ def reset_timer():
     global _run_started_at
     _run_started_at = None
 
+# --- controls shared by every game mode: input queueing, the reset combo, board rules ---
+COMBO_WINDOW = 0.35   # UP and DOWN on one controller this close together = reset
+
+class KioskControls:
+    # mixed into GameSnake and PartySnake; each keeps combo_presses = [[last UP, last DOWN]] per controller
+    __slots__ = ()
+
+    def on_dir_gui(self, d, source="gui"):
+        if touch_controls_enabled is not None and not touch_controls_enabled.get():
+            return  # GUI input disabled while toggle OFF
+        inputs.push(d, source)
+
+    def on_dir_gpio(self, d, player=0):
+        # runs on gpiozero's thread: enqueue only, game_tick applies it
+        inputs.push(d, "gpio", player)
+
+    def _combo(self, source, d, player, t):
+        # True (and the game reset) when this press completes an UP+DOWN combo
+        if source != "gpio" or d not in (UP, DOWN): return False
+        presses = self.combo_presses[player]
+        presses[d == DOWN] = t
+        if not (presses[0] > 0 and presses[1] > 0 and abs(presses[0] - presses[1]) <= COMBO_WINDOW):
+            return False
+        metrics.inc("snake_combo_resets_total")
+        input_accepted(t)
+        self.reset()   # clears the presses, so the combo does not latch
+        return True
+
+    def _clear_combo(self):
+        for presses in self.combo_presses: presses[:] = [0.0, 0.0]
+
+    def _rules_changed(self):
+        pass
+
+    def admin_settings(self, parent):
+        Label(parent, text="Apples on board").pack(pady=(4,2))
+        apples_var = IntVar(value=self.apples_total)
+        Spinbox(parent, from_=1, to=10, textvariable=apples_var, width=6).pack()
+        def apply_apples():
+            self.apples_total = max(1, int(apples_var.get()))
+            self._rules_changed()
+            self._spawn_foods()
+        Button(parent, text="Apply apples", command=apply_apples).pack(pady=6)
+
+        walls_var = BooleanVar(value=self.walls_enabled)
+        def on_walls():
+            self.walls_enabled = bool(walls_var.get())
+            self._rules_changed()
+        Checkbutton(parent, text="Enable borders (no wrap)", variable=walls_var, command=on_walls).pack(pady=6)
+
 # --- Snake game ---
-class GameSnake:
+class GameSnake(KioskControls, SnakeEngine):
     name = "Snake"
+    __slots__ = ("col_snake", "col_head", "col_food", "col_score", "rainbow", "over_at",
+                 "combo_presses", "demo", "waiting_since", "player", "banner")
+
     def __init__(self):
         # configurable colors
         self.col_snake = (0,120,0,0)
@@ -113,38 +679,30 @@ class GameSnake:
         self.col_food  = (120,0,0,0)
         self.col_score = (0,0,120,0)
         self.rainbow = False
-        self.walls_enabled = False
-        self.apples_total = 1
-
-        # state
-        self.state = "waiting_start"
-        self.direction = RIGHT
-        self.pending = RIGHT
-        self.snake = [(3,8),(2,8),(1,8)]
-        self.occ = set(self.snake)
-        self.foods = set()
-        self._spawn_foods()
+
+        # rules + state (walls off, one apple)
+        super().__init__(W, H, walls_enabled=False, apples_total=1)
         self.over_at = None
+        self.banner = None          # game-over text instead of the bare score
+        self.demo = False
+        self.player = None          # ReplayPlayer while a replay log is playing
+        self.waiting_since = time.monotonic()
 
         # GPIO restart combo
-        self.last_up_press = 0.0
-        self.last_down_press = 0.0
-        self._combo_armed = False  # becomes True only when both were pressed close together
+        self.combo_presses = [[0.0, 0.0]]
 
     # --- admin panels (settings + colors) ---
-    def admin_settings(self, parent):
-        Label(parent, text="Apples on board").pack(pady=(4,2))
-        apples_var = IntVar(value=self.apples_total)
-        Spinbox(parent, from_=1, to=10, textvariable=apples_var, width=6).pack()
-        def apply_apples():
-            self.apples_total = max(1, int(apples_var.get()))
-            self.foods = {p for p in self.foods if p not in self.occ}
-            self._spawn_foods()
-        Button(parent, text="Apply apples", command=apply_apples).pack(pady=6)
+    def _rules_changed(self):
+        recorder.cancel()   # settings changed mid-run: the log could not be replayed
 
-        walls_var = BooleanVar(value=self.walls_enabled)
-        def on_walls(): self.walls_enabled = bool(walls_var.get())
-        Checkbutton(parent, text="Enable borders (no wrap)", variable=walls_var, command=on_walls).pack(pady=6)
+    def admin_settings(self, parent):
+        super().admin_settings(parent)
+        attract_var = BooleanVar(value=attract_enabled)
+        def on_attract():
+            global attract_enabled
+            attract_enabled = bool(attract_var.get())
+            if not attract_enabled and self.demo: self.reset()
+        Checkbutton(parent, text=f"Attract mode (self-play after {ATTRACT_AFTER}s idle)", variable=attract_var, command=on_attract).pack(pady=6)
 
         rain_var = BooleanVar(value=self.rainbow)
         def on_rain(): self.rainbow = bool(rain_var.get())
@@ -163,207 +721,325 @@ class GameSnake:
         Button(parent, text="Apple color",       command=lambda: pick_color(self.col_food,  lambda c: setattr(self, "col_food",  c))).pack(pady=6)
         Button(parent, text="Score color",       command=lambda: pick_color(self.col_score, lambda c: setattr(self, "col_score", c))).pack(pady=6)
 
-    # --- core game ---
-    def _spawn_foods(self):
-        while len(self.foods) < self.apples_total:
-            p = (random.randrange(0,W), random.randrange(0,H))
-            if p not in self.occ and p not in self.foods:
-                self.foods.add(p)
-
-    def score(self):
-        return max(0, len(self.snake) - 3)
-
-    def _orient_start(self, d):
-        # allow LEFT/UP/DOWN at startup; ignore RIGHT
-        cx, cy = 3, 8
-        if d == LEFT:   s = [(cx,cy),(cx-1,cy),(cx-2,cy)]
-        elif d == UP:   s = [(cx,cy),(cx,cy+1),(cx,cy+2)]
-        elif d == DOWN: s = [(cx,cy),(cx,cy-1),(cx,cy-2)]
-        else:           s = [(cx,cy),(cx+1,cy),(cx+2,cy)]  # RIGHT ignored elsewhere
-        self.snake = [(x % W, y % H) for (x,y) in s]
-        self.occ = set(self.snake)
-
-    def on_dir_gui(self, d):
-        if not touch_controls_enabled.get():
-            return  # GUI input disabled while toggle OFF
-        self._on_dir(d)
-
-    def on_dir_gpio(self, d):
-        # record for combo reset
-        now = time.monotonic()
-        if d == UP:
-            self.last_up_press = now
-        elif d == DOWN:
-            self.last_down_press = now
-
-        # Arm combo only when both pressed within window; clear after use
-        if self._combo_detected():
-            self._perform_combo_reset()
-            return
-
-        self._on_dir(d)
-
-    def _combo_detected(self):
-        if self.last_up_press > 0 and self.last_down_press > 0:
-            if abs(self.last_up_press - self.last_down_press) <= 0.35:
-                return True
-        return False
-
-    def _perform_combo_reset(self):
-        # Reset once and clear the combo timestamps so it does not latch
-        self.reset()
-        # clear timestamps to prevent immediate re-trigger on next button
-        self.last_up_press = 0.0
-        self.last_down_press = 0.0
-
-    def _on_dir(self, d):
+    def process_inputs(self):
+        # Tk thread: apply queued input in arrival order; turns land in the engine's turn buffer
+        for t, source, d, player in inputs.drain():
+            if player: continue   # extra controllers only play in party mode
+            metrics.inc("snake_inputs_total")
+            if self._combo(source, d, player, t): continue
+            self._on_dir(d, t)
+
+    def _on_dir(self, d, t):
+        if self.demo:
+            input_accepted(t)
+            self.reset()   # any input ends the demo; the press then counts as a normal start
         if self.state == "waiting_start":
             if d == RIGHT:
                 return  # ignore RIGHT at startup
-            self.pending = d
-            self._orient_start(d)
-            self.state = "running"
+            input_accepted(t)
+            seed = random.getrandbits(32)
+            if record_replays:
+                recorder.begin(self, d, seed, timed_mode, timed_seconds)
+            self.start(d, seed)
             reset_timer()  # new run
             start_timer_if_needed()
             return
-        if self.state != "running":
-            return
-        # running
-        if (self.direction[0] + d[0], self.direction[1] + d[1]) != (0,0):
-            self.pending = d
-
-    def _move(self):
-        self.direction = self.pending
-        hx, hy = self.snake[0]
-        tx, ty = self.snake[-1]
-        nx, ny = hx + self.direction[0], hy + self.direction[1]
-        if self.walls_enabled:
-            if nx < 0 or nx >= W or ny < 0 or ny >= H:
-                return False
-        else:
-            nx %= W; ny %= H
-        if (nx,ny) in self.occ and (nx,ny) != (tx,ty):
-            return False
-        ate = (nx,ny) in self.foods
-        self.snake.insert(0, (nx,ny)); self.occ.add((nx,ny))
-        if ate:
-            self.foods.remove((nx,ny))
-            self._spawn_foods()
-        else:
-            tail = self.snake.pop(); self.occ.discard(tail)
-        return True
+        if self.turn(d):
+            input_accepted(t)
+            recorder.turn(self.ticks, d)
 
     def tick(self):
         if self.state == "waiting_start":
+            if attract_enabled and time.monotonic() - self.waiting_since > ATTRACT_AFTER:
+                self._start_demo()
             return
         if self.state == "running":
+            if self.player:
+                if not self.player.feed(self):
+                    self.end_reason = "time"
+                    self._round_end(); return
+                self.step()
+                return
+            if self.demo:
+                if self.ticks >= DEMO_MAX_TICKS:
+                    self._end_demo(); return
+                autopilot.budget_s = AUTOPILOT_BUDGET * step_seconds()
+                d = autopilot.plan(self)
+                if d: self.turn(d)
+                self.step()
+                return
             if timer_expired():
+                self.end_reason = "time"
                 self._round_end(); return
-            if not self._move():
-                self._death(); return
+            self.step()
             return
         if self.state == "game_over":
             # auto-restart after hold
-            if self.over_at and (time.monotonic() - self.over_at) > SCORE_HOLD_SECONDS:
+            if self.over_at and (time.monotonic() - self.over_at) > self.hold_seconds():
                 self.reset()
             return
 
-    def _death(self):
+    def _start_demo(self):
+        self.demo = True
+        self.start(LEFT)
+
+    def _end_demo(self):
+        self.reset()
+        # come back to the start screen briefly, then the next demo game
+        self.waiting_since = time.monotonic() - ATTRACT_AFTER + DEMO_RESTART_PAUSE
+
+    def play_replay(self, rep):
+        # show a recorded run on the LEDs in real time; any input hands control back
+        if (rep.w, rep.h) != (self.w, self.h):
+            raise ValueError(f"replay is for a {rep.w}x{rep.h} board")
+        self.reset()
+        self.player = ReplayPlayer(rep)
+        self.player.restore = (self.walls_enabled, self.apples_total)
+        self.walls_enabled, self.apples_total = rep.walls_enabled, rep.apples_total
+        self.set_foods(rep.foods)
+        self.demo = True
+        self.start(rep.start_dir, rep.seed)
+
+    def _end_replay(self, color):
+        # keep the recorded score on screen for the usual hold, without touching the high score
+        self.state = "game_over"
+        self.over_at = time.monotonic()
+        flash(color, 2, 0.12)
+        effects.play(reveal_keys(self._paint_score))
+
+    def _record_score(self):
         global high_score
+        scores.record(self.score(), walls=self.walls_enabled, apples=self.apples_total, timed=timed_mode)
         if self.score() > high_score:
             high_score = self.score()
             update_high_score_label()
+            self.banner = f"NEW BEST {high_score}"
+
+    def _death(self):
+        if self.player:
+            self._end_replay(LOW_RED); return
+        if self.demo:
+            self._end_demo(); return
+        store_replay(self)
+        self._record_score()
         self.state = "game_over"
         self.over_at = time.monotonic()
+        metrics.inc("snake_deaths_total")
         flash(LOW_RED, 2, 0.12)
+        effects.play(reveal_keys(self._paint_score))
 
     def _round_end(self):
-        global high_score
-        if self.score() > high_score:
-            high_score = self.score()
-            update_high_score_label()
+        if self.player:
+            self._end_replay(LOW_WHITE); return
+        if self.demo:
+            self._end_demo(); return
+        store_replay(self)
+        self._record_score()
         self.state = "game_over"
         self.over_at = time.monotonic()
+        metrics.inc("snake_round_ends_total")
         flash(LOW_WHITE, 2, 0.12)
+        effects.play(reveal_keys(self._paint_score))
 
     def draw(self):
         # LEDs draw always, independent of GUI state
-        pixels.fill(BLACK)
-        for fx,fy in self.foods:
-            pixels[idx(fx,fy)] = self.col_food
+        frame.fill(BLACK)
+        put = frame.put_cell
+        for c in self.foods:
+            put(c, self.col_food)
+        body = self.body
+        cells, cap, h = body.cells, body.cap, body.head_i
         if self.rainbow:
-            for i,(x,y) in enumerate(self.snake[1:], start=1):
-                pixels[idx(x,y)] = wheel((i*12) & 255)
+            for i in range(1, body.length):
+                put(cells[(h + i) % cap], RAINBOW[i & 63])
         else:
-            for (x,y) in self.snake[1:]:
-                pixels[idx(x,y)] = self.col_snake
-        hx,hy = self.snake[0]
-        pixels[idx(hx,hy)] = self.col_head
-        pixels.show()
+            col = bytes(self.col_snake)
+            for i in range(1, body.length):
+                put(cells[(h + i) % cap], col)
+        put(cells[h], self.col_head)
+        frame.show()
 
     def draw_score_or_status(self):
-        # Show this round’s score on LEDs
-        self._draw_number_centered(self.score(), self.col_score, mirror_x=True)
+        # Show this round’s score on LEDs (scrolling if it is wider than the board)
+        self._paint_score(frame)
+        frame.show()
+
+    def _paint_score(self, fb):
+        t = time.monotonic() - self.over_at if self.over_at else 0.0
+        fb.blit(status_frame(self.status_text(), self.col_score, t, mirror_x=True))
+
+    def status_text(self):
+        return self.banner or str(self.score())
+
+    def hold_seconds(self):
+        # the game-over screen stays up for the hold, or one full pass of a scrolling message
+        return max(SCORE_HOLD_SECONDS, status_seconds(self.status_text(), self.col_score, mirror_x=True))
 
     def reset(self):
         # back to startup position
-        self.state = "waiting_start"
-        self.direction = RIGHT
-        self.pending = RIGHT
-        self.snake = [(3,8),(2,8),(1,8)]
-        self.occ = set(self.snake)
-        self.foods.clear()
-        self._spawn_foods()
+        recorder.cancel()
+        if self.player:
+            self.walls_enabled, self.apples_total = self.player.restore
+            self.player = None
+        super().reset()
+        metrics.inc("snake_resets_total")
         self.over_at = None
+        self.banner = None
+        self.demo = False
+        self.waiting_since = time.monotonic()
         reset_timer()
-        # also clear combo latch to avoid immediate re-trigger
-        self.last_up_press = 0.0
-        self.last_down_press = 0.0
+        self._clear_combo()   # avoid an immediate re-trigger
+        effects.clear()
         self.draw()
 
-    # --- 3x5 digits with X-mirror that also reverses digit order when mirroring ---
-    def _draw_digit(self, ch, ox, oy, color, mirror_x=False):
-        DIGITS = {
-            '0': ["111","101","101","101","111"],
-            '1': ["010","110","010","010","111"],
-            '2': ["111","001","111","100","111"],
-            '3': ["111","001","111","001","111"],
-            '4': ["101","101","111","001","001"],
-            '5': ["111","100","111","001","111"],
-            '6': ["111","100","111","101","111"],
-            '7': ["111","001","001","010","010"],
-            '8': ["111","101","111","101","111"],
-            '9': ["111","101","111","001","111"],
-        }
-        pat = DIGITS.get(ch)
-        if not pat: return
-        for y, row in enumerate(pat):
-            for x, c in enumerate(row):
-                if c != '1': 
-                    continue
-                px = ox + (2 - x) if mirror_x else ox + x
-                py = oy + y
-                if 0 <= px < W and 0 <= py < H:
-                    pixels[idx(px,py)] = color
-
     def _draw_number_centered(self, n, color, mirror_x=False):
-        s = str(n)
-        w = len(s) * 4 - 1  # 3px glyph + 1px space
-        h = 5
-        ox = max(0, (W - w)//2)
-        oy = max(0, (H - h)//2)
+        self._paint_number_centered(frame, n, color, mirror_x)
+        frame.show()
+
+    def _paint_number_centered(self, fb, n, color, mirror_x=False):
+        fb.blit(text_frame(str(n), color, mirror_x))
+
+# --- Party mode: 2-4 snakes on one board, one controller each ---
+PLAYER_COLORS = [(0,120,0,0), (0,0,160,0), (110,70,0,0), (90,0,110,0)]   # body; heads are brighter
+
+def _screen_hex(color):
+    # LED colors are dim on purpose; stretch to full range for the touchscreen
+    r, g, b = color[:3]
+    k = 255 / max(1, r, g, b)
+    return "#%02x%02x%02x" % (int(r * k), int(g * k), int(b * k))
+
+class PartySnake(KioskControls, MultiSnakeEngine):
+    name = "Party Snake"
+    __slots__ = ("colors", "col_food", "over_at", "combo_presses")
+
+    def __init__(self, players, walls_enabled=False, apples_total=1):
+        self.colors = list(PLAYER_COLORS[:players])
+        self.col_food = (120,0,0,0)
+        self.combo_presses = [[0.0, 0.0] for _ in range(players)]   # last UP, last DOWN per player
+        super().__init__(players, W, H, walls_enabled=walls_enabled, apples_total=apples_total)
+        self.over_at = None
 
-        pixels.fill(BLACK)
+    def head_color(self, k):
+        return tuple(min(255, v * 5 // 3) for v in self.colors[k])
 
-        seq = s[::-1] if mirror_x else s
-        for i, ch in enumerate(seq):
-            x = ox + i * 4
-            self._draw_digit(ch, x, oy, color, mirror_x=mirror_x)
+    # --- admin panels (board rules come from KioskControls) ---
+    def admin_colors(self, parent):
+        from tkinter.colorchooser import askcolor
+        def pick_color(k):
+            rgb, _ = askcolor(color=_screen_hex(self.colors[k]), parent=parent)
+            if not rgb: return
+            self.colors[k] = (clamp255(rgb[0]), clamp255(rgb[1]), clamp255(rgb[2]), 0)
+            update_player_labels()
+        for k in range(len(self.snakes)):
+            Button(parent, text=f"Player {k + 1} color", command=lambda k=k: pick_color(k)).pack(pady=6)
+        def pick_food():
+            rgb, _ = askcolor(color=_screen_hex(self.col_food), parent=parent)
+            if rgb: self.col_food = (clamp255(rgb[0]), clamp255(rgb[1]), clamp255(rgb[2]), 0)
+        Button(parent, text="Apple color", command=pick_food).pack(pady=6)
+
+    # --- input (same queue as single-player; the player index picks the snake) ---
+    def process_inputs(self):
+        for t, source, d, player in inputs.drain():
+            if player >= len(self.snakes): continue
+            metrics.inc("snake_inputs_total")
+            if self._combo(source, d, player, t): continue
+            if self.state == "waiting_start":
+                # any player's first press starts the round for everyone
+                self.start(random.getrandbits(32))
+                input_accepted(t)
+                reset_timer()
+                start_timer_if_needed()
+            if self.turn(player, d): input_accepted(t)
 
-        pixels.show()
+    def tick(self):
+        if self.state == "running":
+            if timer_expired():
+                alive = self.alive()
+                best = max(s.score for s in alive)
+                leaders = [s for s in alive if s.score == best]
+                self.winner = leaders[0] if len(leaders) == 1 else None
+                self.end_reason = "time"
+                self._round_end(); return
+            self.step()
+        elif self.state == "game_over":
+            if self.over_at and (time.monotonic() - self.over_at) > SCORE_HOLD_SECONDS:
+                self.reset()
+
+    def step(self):
+        before = sum(s.score for s in self.snakes)
+        super().step()
+        if sum(s.score for s in self.snakes) != before: update_player_labels()
+
+    def _death(self, s, cells):
+        # blink the lost body over the live board: the others are still playing
+        metrics.inc("snake_deaths_total")
+        col = self.colors[s.id]
+        def lost(fb, t):
+            self._paint_board(fb)
+            for c in cells: fb.put_cell(c, col)
+        effects.play([(0.1, lost), (0.1, lambda fb, t: self._paint_board(fb))] * 2)
+        update_player_labels()
+
+    def _round_end(self):
+        self.state = "game_over"
+        self.over_at = time.monotonic()
+        metrics.inc("snake_round_ends_total")
+        flash(self.head_color(self.winner.id) if self.winner else LOW_WHITE, 2, 0.12)
+        effects.play(reveal_keys(self._paint_score))
+        update_player_labels()
+
+    # --- LEDs ---
+    def draw(self):
+        self._paint_board(frame)
+        frame.show()
+
+    def _paint_board(self, fb):
+        fb.fill(BLACK)
+        put = fb.put_cell
+        for c in self.foods:
+            put(c, self.col_food)
+        for s in self.snakes:
+            body = s.body
+            if not body.length: continue
+            cells, cap, h = body.cells, body.cap, body.head_i
+            col = bytes(self.colors[s.id])
+            for i in range(1, body.length):
+                put(cells[(h + i) % cap], col)
+            put(cells[h], self.head_color(s.id))
+
+    def draw_score_or_status(self):
+        self._paint_score(frame)
+        frame.show()
+
+    def _paint_score(self, fb):
+        fb.blit(party_score_frame(tuple(s.score for s in self.snakes), tuple(self.colors), True))
+
+    def reset(self):
+        super().reset()
+        metrics.inc("snake_resets_total")
+        self.over_at = None
+        reset_timer()
+        self._clear_combo()
+        effects.clear()
+        update_player_labels()
+        self.draw()
 
 # --- Instantiate game ---
-game = GameSnake()
+solo = GameSnake()
+game = solo            # whatever is on the board now: solo, or a PartySnake while party mode is on
+players = 1
+
+def set_players(n):
+    # 1 = classic single-player; 2-4 = party mode with one controller per player
+    global game, players
+    players = max(1, min(len(PLAYER_GPIO_PINS), int(n)))
+    effects.clear()
+    if players == 1:
+        game = solo
+    else:
+        game = PartySnake(players, walls_enabled=solo.walls_enabled, apples_total=solo.apples_total)
+    game.reset()
+    update_player_labels()
 
 # --- Physical buttons (optional) ---
 GPIO_PINS = {
@@ -372,53 +1048,63 @@ GPIO_PINS = {
     "LEFT": 13,   # per request
     "RIGHT": 19,  # per request
 }
-gpio_buttons = {}
+# controllers 2-4 for party mode; a missing or unwired set just never sends input
+PLAYER_GPIO_PINS = [
+    GPIO_PINS,
+    {"UP": 17, "DOWN": 27, "LEFT": 22, "RIGHT": 23},
+    {"UP": 16, "DOWN": 20, "LEFT": 26, "RIGHT": 25},
+    {"UP": 7,  "DOWN": 8,  "LEFT": 10, "RIGHT": 11},
+]
+_PIN_DIRS = {"UP": UP, "DOWN": DOWN, "LEFT": LEFT, "RIGHT": RIGHT}
+gpio_buttons = {}   # (player, name) -> gpiozero Button
 def setup_gpio():
+    # runs on a background thread at start-up: importing gpiozero and claiming pins is slow
     if not USE_GPIO: return
     try:
-        for name, pin in GPIO_PINS.items():
-            btn = GpioButton(pin, pull_up=True, bounce_time=0.03, hold_time=0.0)
-            gpio_buttons[name] = btn
-        gpio_buttons["UP"].when_pressed    = lambda: game.on_dir_gpio(UP)
-        gpio_buttons["DOWN"].when_pressed  = lambda: game.on_dir_gpio(DOWN)
-        gpio_buttons["LEFT"].when_pressed  = lambda: game.on_dir_gpio(LEFT)
-        gpio_buttons["RIGHT"].when_pressed = lambda: game.on_dir_gpio(RIGHT)
+        from gpiozero import Button as GpioButton
     except Exception:
-        gpio_buttons.clear()
+        return
+    for k, pins in enumerate(PLAYER_GPIO_PINS):
+        try:
+            for name, pin in pins.items():
+                btn = GpioButton(pin, pull_up=True, bounce_time=0.03, hold_time=0.0)
+                btn.when_pressed = lambda d=_PIN_DIRS[name], k=k: game.on_dir_gpio(d, k)
+                gpio_buttons[k, name] = btn
+        except Exception:
+            for name in pins:
+                btn = gpio_buttons.pop((k, name), None)
+                if btn: btn.close()
 
 # --- Root controls (GUI D-pad) ---
-btn_style = dict(height=3, width=10, font=("Arial", 16))
-b_up    = TkButton(root, text="↑", **btn_style, command=lambda: game.on_dir_gui(UP))
-b_down  = TkButton(root, text="↓", **btn_style, command=lambda: game.on_dir_gui(DOWN))
-b_left  = TkButton(root, text="←", **btn_style, command=lambda: game.on_dir_gui(LEFT))
-b_right = TkButton(root, text="→", **btn_style, command=lambda: game.on_dir_gui(RIGHT))
-b_reset = TkButton(root, text="Reset", height=2, width=10, command=lambda: game.reset())
+b_up = b_down = b_left = b_right = b_reset = b_admin = None
+hs_var = hs_label = None
 
 # Admin button + high-score label
 def reset_high_score():
     global high_score
     high_score = 0
+    scores.reset()
     update_high_score_label()
 
 def update_high_score_label():
-    hs_var.set(f"High Score: {high_score}")
-
-b_admin = TkButton(root, text="Admin", height=1, width=10, command=lambda: open_admin())
-hs_var = StringVar(value="High Score: 0")
-hs_label = Label(root, textvariable=hs_var, font=("Arial", 28))
-
-# Layout grid
-for r in (0,1,2,3,4): root.grid_rowconfigure(r, weight=1)
-for c in (0,1,2):     root.grid_columnconfigure(c, weight=1)
-
-b_admin.grid(row=0, column=0, sticky="nw", padx=8, pady=8)
-b_up.grid(   row=1, column=1, sticky="nsew", padx=8, pady=8)
-b_left.grid( row=2, column=0, sticky="nsew", padx=8, pady=8)
-b_right.grid(row=2, column=2, sticky="nsew", padx=8, pady=8)
-b_down.grid( row=3, column=1, sticky="nsew", padx=8, pady=8)
-b_reset.grid(row=3, column=2, sticky="nsew", padx=8, pady=8)
-hs_label.grid(row=2, column=0, columnspan=3, sticky="nsew", padx=8, pady=8)
-hs_label.grid_remove()
+    if hs_var is not None: hs_var.set(f"High Score: {high_score}")
+
+players_frame = None
+player_labels = []
+def update_player_labels():
+    # party mode: one score per player in that player's color (hidden in single-player)
+    if players_frame is None: return
+    if game is solo:
+        players_frame.grid_remove(); return
+    players_frame.grid()
+    for k, lbl in enumerate(player_labels):
+        if k >= len(game.snakes):
+            lbl.pack_forget(); continue
+        s = game.snakes[k]
+        mark = " (out)" if not s.alive and game.state == "running" else ""
+        if game.state == "game_over" and game.winner is s: mark = " WINS"
+        lbl.config(text=f"P{k + 1}: {s.score}{mark}", fg=_screen_hex(game.colors[k]))
+        lbl.pack(side="left", expand=True)
 
 def set_controls_enabled(enabled: bool):
     state = "normal" if enabled else "disabled"
@@ -426,26 +1112,145 @@ def set_controls_enabled(enabled: bool):
         try: w.config(state=state)
         except: pass
 
-# Keyboard controls map to GUI player
-root.bind("<Up>",    lambda e: game.on_dir_gui(UP))
-root.bind("<Down>",  lambda e: game.on_dir_gui(DOWN))
-root.bind("<Left>",  lambda e: game.on_dir_gui(LEFT))
-root.bind("<Right>", lambda e: game.on_dir_gui(RIGHT))
-# Failsafe hotkeys
-root.bind("<F10>",   lambda e: open_admin())
-root.bind("<F11>",   lambda e: set_fullscreen(not root.attributes("-fullscreen")))
-root.bind("<Escape>",lambda e: exit_fullscreen_and_minimize())
-root.focus_set()
+# --- on-screen mirror of the LED matrix: one rectangle per cell, recolored only on change ---
+# The rectangles are created once; each pushed frame is diffed against the last one drawn and
+# only changed cells get an itemconfigure, so Tk work follows what moved, not the board size.
+MIRROR_FLIP_X = True     # +x runs to the viewer's left on the matrix (see LEFT/RIGHT)
+MIRROR_SIZE_PX = 192     # longest side of the preview
+
+def _screen_level(v):
+    # LED levels are dim on purpose; lift them so the preview is readable on the touchscreen
+    return int(255 * (v / 255) ** 0.5)
+_SCREEN_LEVEL = [_screen_level(v) for v in range(256)]
+
+class CanvasMirror:
+    def __init__(self, parent):
+        cell = max(2, MIRROR_SIZE_PX // max(W, H))
+        self.canvas = Canvas(parent, width=W * cell, height=H * cell, bg="black", highlightthickness=0)
+        self.items = [0] * N       # frame pixel offset -> rectangle id
+        for c in range(N):
+            y, x = divmod(c, W)
+            if MIRROR_FLIP_X: x = W - 1 - x
+            self.items[XY_TABLE[c]] = self.canvas.create_rectangle(
+                x * cell, y * cell, (x + 1) * cell, (y + 1) * cell, fill="black", outline="")
+        self._shown = array("I", bytes(N * BPP))   # last frame drawn, one RGBW word per pixel
+        self._hex = {0: "black"}
+        self._pending = False
+        self.enabled = True
+        self.recolored = 0
+
+    def _color(self, word):
+        r, g, b, w = word.to_bytes(4, sys.byteorder)
+        lv = _SCREEN_LEVEL
+        h = self._hex[word] = "#%02x%02x%02x" % (lv[min(255, r + w)], lv[min(255, g + w)], lv[min(255, b + w)])
+        return h
+
+    def schedule(self):
+        # called after a frame was pushed; the redraw waits until Tk is idle and coalesces
+        if self.enabled and not self._pending:
+            self._pending = True
+            self.canvas.after_idle(self.update)
+
+    def update(self):
+        self._pending = False
+        if not self.enabled: return
+        new = array("I", frame.buf)
+        cfg, items, hexes = self.canvas.itemconfigure, self.items, self._hex
+        n = 0
+        for i, (a, b) in enumerate(zip(new, self._shown)):
+            if a != b:
+                cfg(items[i], fill=hexes.get(a) or self._color(a))
+                n += 1
+        self._shown = new
+        self.recolored += n
+
+    def set_enabled(self, on):
+        self.enabled = on
+        if on:
+            self.canvas.grid()
+            self._shown = array("I", [0xFFFFFFFF]) * N   # matches nothing: next update repaints all
+            self.schedule()
+        else:
+            self.canvas.grid_remove()
+
+mirror = None
+
+def _frame_pushed(fb):
+    # frame.on_push: a new frame reached the LEDs (from game_tick, a reset, an admin action...)
+    global _input_waiting_since
+    if mirror is not None: mirror.schedule()
+    if stream is not None: stream.publish(fb.buf)
+    if _input_waiting_since is not None:
+        metrics.observe("snake_input_to_led_seconds", time.monotonic() - _input_waiting_since)
+        _input_waiting_since = None
+
+frame.on_push = _frame_pushed
 
 # --- Admin Notebook (topmost, tabs) ---
 admin_window = None
 ADMIN_CODE = "0028"
-timed_var = BooleanVar(value=False)
-minutes_var = IntVar(value=2)
-score_hold_var = IntVar(value=SCORE_HOLD_SECONDS)
-fullscreen_var = BooleanVar(value=True)
+timed_var = minutes_var = score_hold_var = fullscreen_var = None
 brightness_var = None
-touch_controls_enabled = BooleanVar(value=True)  # toggle D-pad visibility and input
+touch_controls_enabled = None  # BooleanVar: toggle D-pad visibility and input
+
+def build_gui():
+    global root, b_up, b_down, b_left, b_right, b_reset, b_admin, hs_var, hs_label, players_frame, mirror
+    global timed_var, minutes_var, score_hold_var, fullscreen_var, touch_controls_enabled
+    root = Tk()
+    root.title("Snake")
+    root.geometry("520x640")
+    root.attributes("-fullscreen", True)   # kiosk start
+
+    timed_var = BooleanVar(value=False)
+    minutes_var = IntVar(value=2)
+    score_hold_var = IntVar(value=SCORE_HOLD_SECONDS)
+    fullscreen_var = BooleanVar(value=True)
+    touch_controls_enabled = BooleanVar(value=True)
+
+    btn_style = dict(height=3, width=10, font=("Arial", 16))
+    b_up    = TkButton(root, text="↑", **btn_style, command=lambda: game.on_dir_gui(UP))
+    b_down  = TkButton(root, text="↓", **btn_style, command=lambda: game.on_dir_gui(DOWN))
+    b_left  = TkButton(root, text="←", **btn_style, command=lambda: game.on_dir_gui(LEFT))
+    b_right = TkButton(root, text="→", **btn_style, command=lambda: game.on_dir_gui(RIGHT))
+    b_reset = TkButton(root, text="Reset", height=2, width=10, command=lambda: game.reset())
+
+    b_admin = TkButton(root, text="Admin", height=1, width=10, command=lambda: open_admin())
+    hs_var = StringVar(value=f"High Score: {high_score}")
+    hs_label = Label(root, textvariable=hs_var, font=("Arial", 28))
+
+    # Layout grid
+    for r in (0,1,2,3,4): root.grid_rowconfigure(r, weight=1)
+    for c in (0,1,2):     root.grid_columnconfigure(c, weight=1)
+
+    b_admin.grid(row=0, column=0, sticky="nw", padx=8, pady=8)
+    b_up.grid(   row=1, column=1, sticky="nsew", padx=8, pady=8)
+    b_left.grid( row=2, column=0, sticky="nsew", padx=8, pady=8)
+    b_right.grid(row=2, column=2, sticky="nsew", padx=8, pady=8)
+    b_down.grid( row=3, column=1, sticky="nsew", padx=8, pady=8)
+    b_reset.grid(row=3, column=2, sticky="nsew", padx=8, pady=8)
+    hs_label.grid(row=2, column=0, columnspan=3, sticky="nsew", padx=8, pady=8)
+    hs_label.grid_remove()
+    mirror = CanvasMirror(root)
+    mirror.canvas.grid(row=0, column=1, columnspan=2, padx=8, pady=8)
+    mirror.schedule()   # the boot frame is already on the LEDs
+    players_frame = Frame(root)
+    players_frame.grid(row=4, column=0, columnspan=3, sticky="nsew", padx=8, pady=8)
+    player_labels[:] = [Label(players_frame, font=("Arial", 24)) for _ in PLAYER_GPIO_PINS]
+    update_player_labels()
+
+    # Keyboard controls map to GUI player
+    root.bind("<Up>",    lambda e: game.on_dir_gui(UP, "key"))
+    root.bind("<Down>",  lambda e: game.on_dir_gui(DOWN, "key"))
+    root.bind("<Left>",  lambda e: game.on_dir_gui(LEFT, "key"))
+    root.bind("<Right>", lambda e: game.on_dir_gui(RIGHT, "key"))
+    # Failsafe hotkeys
+    root.bind("<F9>",    lambda e: start_profile())
+    root.bind("<F10>",   lambda e: open_admin())
+    root.bind("<F11>",   lambda e: set_fullscreen(not root.attributes("-fullscreen")))
+    root.bind("<Escape>",lambda e: exit_fullscreen_and_minimize())
+    root.focus_set()
+
+    root.protocol("WM_DELETE_WINDOW", on_close)
 
 def open_admin():
     global admin_window
@@ -528,6 +1333,7 @@ def show_admin_window():
 
     admin_window.protocol("WM_DELETE_WINDOW", _on_close)
 
+    from tkinter import ttk
     notebook = ttk.Notebook(admin_window)
     notebook.pack(fill="both", expand=True, padx=6, pady=6)
 
@@ -554,17 +1360,36 @@ def show_admin_window():
         SCORE_HOLD_SECONDS = max(1, int(score_hold_var.get()))
     Button(rules_tab, text="Apply score hold", command=apply_hold).pack(pady=6)
 
+    speed_var = BooleanVar(value=speed_curve is not None)
+    def on_toggle_speed():
+        global speed_curve
+        speed_curve = linear_speed_curve() if speed_var.get() else None
+    Checkbutton(rules_tab, text="Speed up as score rises", variable=speed_var, command=on_toggle_speed).pack(pady=6)
+
+    Label(rules_tab, text="Players (1 = classic, 2-4 = party mode)").pack(pady=(8,2))
+    players_var = IntVar(value=players)
+    Spinbox(rules_tab, from_=1, to=len(PLAYER_GPIO_PINS), textvariable=players_var, width=6).pack()
+    def apply_players():
+        set_players(players_var.get())
+        fill_game_panels()
+    Button(rules_tab, text="Apply players", command=apply_players).pack(pady=6)
+
     Label(rules_tab, text="This game's settings").pack(pady=(12,4))
     game_settings_frame = Frame(rules_tab)
     game_settings_frame.pack(fill="both", expand=True, padx=4, pady=4)
-    game.admin_settings(game_settings_frame)
 
     # --- Colors tab ---
     colors_tab = Frame(notebook)
     notebook.add(colors_tab, text="Colors")
     game_colors_frame = Frame(colors_tab)
     game_colors_frame.pack(fill="both", expand=True, padx=4, pady=4)
-    game.admin_colors(game_colors_frame)
+
+    def fill_game_panels():
+        for f in (game_settings_frame, game_colors_frame):
+            for child in f.winfo_children(): child.destroy()
+        game.admin_settings(game_settings_frame)
+        game.admin_colors(game_colors_frame)
+    fill_game_panels()
 
     # --- Screen tab ---
     screen_tab = Frame(notebook)
@@ -580,14 +1405,25 @@ def show_admin_window():
 
     Label(screen_tab, text="LED Brightness").pack(pady=(12,4))
     if brightness_var is None:
-        brightness_var = IntVar(value=int(BRIGHTNESS*100))
+        brightness_var = IntVar(value=int(lut.brightness*100))
     def on_brightness(val):
-        v = max(2, min(100, int(float(val)))) / 100.0
-        pixels.brightness = v
-        pixels.show()
+        lut.set_brightness(max(2, min(100, int(float(val)))) / 100.0)
+        frame.show(force=True)
     Scale(screen_tab, from_=2, to=100, orient=HORIZONTAL, variable=brightness_var,
           command=on_brightness, length=380).pack(pady=6)
 
+    mirror_var = BooleanVar(value=mirror.enabled)
+    Checkbutton(screen_tab, text="Show board preview", variable=mirror_var,
+                command=lambda: mirror.set_enabled(bool(mirror_var.get()))).pack(pady=6)
+
+    Label(screen_tab, text="Power save after (minutes without input, 0 = never)").pack(pady=(8,2))
+    idle_var = IntVar(value=IDLE_AFTER // 60)
+    Spinbox(screen_tab, from_=0, to=240, textvariable=idle_var, width=6).pack()
+    def apply_idle():
+        global IDLE_AFTER
+        IDLE_AFTER = max(0, int(idle_var.get())) * 60
+    Button(screen_tab, text="Apply power save", command=apply_idle).pack(pady=6)
+
     # Touch D-pad toggle
     def on_toggle_touch():
         apply_touch_toggle()
@@ -595,8 +1431,74 @@ def show_admin_window():
 
     Button(screen_tab, text="Reset HIGH SCORE", command=reset_high_score).pack(pady=6)
 
+    # --- Leaderboard tab ---
+    board_tab = Frame(notebook)
+    notebook.add(board_tab, text="Leaderboard")
+    board_var = StringVar()
+    Label(board_tab, textvariable=board_var, justify="left", font=("Courier", 11)).pack(anchor="w", padx=8, pady=8)
+    def refresh_board():
+        if not board_tab.winfo_exists(): return
+        lines = [f"{'#':>2s} {'score':>5s}  {'when':16s} settings"]
+        for i, e in enumerate(scores.leaderboard(), start=1):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(e["t"]))
+            opts = ", ".join(k for k in ("walls", "timed") if e.get(k)) or "wrap"
+            lines.append(f"{i:2d} {e['score']:5d}  {when:16s} {opts}, {e.get('apples', 1)} apple(s)")
+        board_var.set("\n".join(lines))
+        board_tab.after(2000, refresh_board)
+    refresh_board()
+    Button(board_tab, text="Reset HIGH SCORE + leaderboard", command=reset_high_score).pack(pady=10)
+
+    # --- Diagnostics tab ---
+    diag_tab = Frame(notebook)
+    notebook.add(diag_tab, text="Diagnostics")
+    diag_var = StringVar()
+    Label(diag_tab, textvariable=diag_var, justify="left", font=("Courier", 11), wraplength=500).pack(anchor="w", padx=8, pady=8)
+    if METRICS_PORT:
+        Label(diag_tab, text=f"Prometheus: http://127.0.0.1:{METRICS_PORT}/metrics").pack(anchor="w", padx=8)
+    Button(diag_tab, text=f"Profile {PROFILE_SECONDS} s", command=start_profile).pack(anchor="w", padx=8, pady=(8,2))
+    prof_var = StringVar()
+    Label(diag_tab, textvariable=prof_var, justify="left", font=("Courier", 9)).pack(anchor="w", padx=8)
+    def refresh_profile():
+        if not diag_tab.winfo_exists(): return
+        if profiler is not None:   # nothing to show before the first capture
+            if profiler.running:
+                prof_var.set(f"profiling... {max(0, profiler.ends_at - time.monotonic()):.0f}s left")
+            elif profiler.error:
+                prof_var.set(f"profile not saved: {profiler.error}")
+            elif profiler.path:
+                prof_var.set(f"saved {profiler.path}\n" + profiler.summary(top=12))
+        diag_tab.after(1000, refresh_profile)
+    refresh_profile()
+    def refresh_diag():
+        if not diag_tab.winfo_exists(): return
+        lmin, lavg, lp99 = tick_stats.lateness_ms()
+        jmin, javg, jp99 = tick_stats.jitter_ms()
+        counters, _gauges, hists = metrics.snapshot()
+        lines = [f"LED output: {led_backend}   frames pushed: {frame.frames_pushed}   skipped: {frame.frames_skipped}",
+                 f"Tick late ms min/avg/p99:   {lmin:.1f} / {lavg:.1f} / {lp99:.1f}",
+                 f"Tick jitter ms min/avg/p99: {jmin:.1f} / {javg:.1f} / {jp99:.1f}",
+                 f"Steps: {tick_stats.steps}   dropped backlogs: {tick_stats.dropped}",
+                 f"Preview cells recolored: {mirror.recolored if mirror else 0}",
+                 idle_summary(), "",
+                 f"{'stage (ms)':28s} {'n':>7s} {'p50':>7s} {'p99':>7s}"]
+        if driver:
+            st = driver.stats()
+            lines.insert(4, f"LED driver: {st['backend']}{'' if st['alive'] else ' (exited)'}   shown {st['shown']}"
+                            f"   dropped {st['dropped']}   late {st['late']}   last push {st['show_ms']:.1f} ms")
+        for name, (n, p50, p99) in hists.items():
+            short = name.replace("snake_", "").replace("_seconds", "")
+            lines.append(f"{short:28s} {n:7d} {p50*1000:7.2f} {p99*1000:7.2f}")
+        lines.append("")
+        for name, v in counters.items():
+            lines.append(f"{name.replace('snake_', '').replace('_total', ''):28s} {v:7d}")
+        lines += ["", boot.summary()]
+        diag_var.set("\n".join(lines))
+        diag_tab.after(1000, refresh_diag)
+    refresh_diag()
+
 def apply_touch_toggle():
     # Show/hide D-pad and high score label. Admin remains available.
+    if touch_controls_enabled is None: return
     on = bool(touch_controls_enabled.get())
     if on:
         # show buttons
@@ -610,31 +1512,236 @@ def apply_touch_toggle():
         hs_label.grid()
         set_controls_enabled(False)  # disable clicks; physical still works
 
-# --- Main loop ---
-TICK = 120
+# --- Main loop: fixed-timestep logic on absolute monotonic deadlines ---
+TICK = 120          # ms per logic step at base speed
+FRAME_RATE = 30     # LED frames per second while an effect or scrolling text is on screen
+MAX_CATCHUP = 3     # logic steps per callback at most; beyond that the backlog is dropped
+
+# Optional speed curve: callable score -> ms per logic step (None = constant TICK)
+speed_curve = None
+def linear_speed_curve(start=TICK, step=5, every=5, floor=60):
+    return lambda score: max(floor, start - (score // every) * step)
+
+def step_seconds():
+    ms = speed_curve(game.score()) if speed_curve else TICK
+    return max(1, ms) / 1000.0
+
+class TickStats:
+    # lateness = how far past its deadline a logic step ran; jitter = |actual interval - target|
+    def __init__(self, size=500):
+        self.late = deque(maxlen=size)
+        self.jitter = deque(maxlen=size)
+        self.steps = 0
+        self.dropped = 0
+        self._last_at = None
+        self._last_target = None
+
+    def record(self, now, deadline, target):
+        self.steps += 1
+        self.late.append(now - deadline)
+        if now == self._last_at: return   # catch-up step in the same callback: no new interval
+        if self._last_at is not None:
+            self.jitter.append(abs((now - self._last_at) - self._last_target))
+        self._last_at = now
+        self._last_target = target
+
+    @staticmethod
+    def _summary(samples):
+        if not samples: return (0.0, 0.0, 0.0)
+        ordered = sorted(samples)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        return (ordered[0] * 1000, sum(ordered) / len(ordered) * 1000, p99 * 1000)
+
+    def lateness_ms(self): return self._summary(self.late)
+    def jitter_ms(self):   return self._summary(self.jitter)
+
+tick_stats = TickStats()
+_next_step_at = None
+_next_frame_at = 0.0
+metrics.gauge("snake_frames_pushed", "LED frames sent to the strip", lambda: frame.frames_pushed)
+metrics.gauge("snake_frames_skipped", "LED frames skipped as unchanged", lambda: frame.frames_skipped)
+metrics.gauge("snake_tick_late_p99_ms", "p99 logic-step lateness over the recent window", lambda: tick_stats.lateness_ms()[2])
+metrics.gauge("snake_score", "Current score", lambda: game.score())
+metrics.gauge("snake_boot_first_frame_seconds", "Process start to the first lit LED frame", lambda: boot.since("first frame") or 0.0)
+metrics.gauge("snake_boot_playable_seconds", "Process start to the first game tick", lambda: boot.since("first tick") or 0.0)
+
+# --- idle power saving: nobody has touched a control for IDLE_AFTER seconds at the start screen ---
+# The logic tick and frame building stop; game_tick only checks the input queue every IDLE_POLL
+# and blinks one dim LED every IDLE_HEARTBEAT. The first input from any source wakes it.
+IDLE_AFTER = 300          # seconds without input before idling (attract demos count as idle); 0 = never
+IDLE_POLL = 0.1           # input check interval while idle
+IDLE_HEARTBEAT = 2.0      # one short blink this often
+IDLE_COLOR = (0,0,0,12)
+
+class IdleClock:
+    # splits running time into active and idle seconds, to measure the saving
+    def __init__(self):
+        self.since = time.monotonic()    # start of the current period
+        self.idle = False
+        self.active_s = self.idle_s = 0.0
+        self.entered = 0
+        self.lit = False
+
+    def _switch(self, now, idle):
+        if self.idle: self.idle_s += now - self.since
+        else: self.active_s += now - self.since
+        self.since, self.idle = now, idle
+
+    def enter(self, now):
+        self._switch(now, True)
+        self.entered += 1
+        self.lit = False
+
+    def leave(self, now):
+        self._switch(now, False)
+
+    def totals(self, now=None):
+        # (active seconds, idle seconds) including the current period
+        if now is None: now = time.monotonic()
+        run = now - self.since
+        return (self.active_s + (0 if self.idle else run), self.idle_s + (run if self.idle else 0))
+
+idle = IdleClock()
+metrics.counter("snake_idle_entries_total", "Times the kiosk went idle")
+metrics.gauge("snake_idle_seconds", "Seconds spent idle since start", lambda: idle.totals()[1])
+metrics.gauge("snake_active_seconds", "Seconds spent active since start", lambda: idle.totals()[0])
+
+def idle_summary():
+    active, idle_s = idle.totals()
+    share = 100 * idle_s / max(1e-9, active + idle_s)
+    return (f"Idle: {'now, ' if idle.idle else ''}{idle_s / 3600:.2f} h idle / {active / 3600:.2f} h active"
+            f" ({share:.0f}% idle, {idle.entered}x)")
+
+def idle_due(now):
+    if not IDLE_AFTER or idle.idle or effects.active(): return False
+    at_rest = game.state == "waiting_start" or (getattr(game, "demo", False) and not getattr(game, "player", None))
+    return at_rest and now - max(inputs.last_at, idle.since) > IDLE_AFTER
+
+def enter_idle(now):
+    if getattr(game, "demo", False): game.reset()   # stop the attract demo
+    idle.enter(now)
+    metrics.inc("snake_idle_entries_total")
+    frame.fill(BLACK)
+    frame.show()
+
+def idle_tick(now):
+    # True once input has arrived: idle is over and this callback continues as a normal tick
+    global _next_step_at
+    if inputs.last_at > idle.since:
+        idle.leave(now)
+        _next_step_at = now                  # no backlog from the idle stretch
+        if hasattr(game, "waiting_since"): game.waiting_since = now
+        return True
+    lit = (now - idle.since) % IDLE_HEARTBEAT < 2 * IDLE_POLL
+    if lit != idle.lit:
+        idle.lit = lit
+        frame.fill(BLACK)
+        if lit: frame.put(W // 2, H // 2, IDLE_COLOR)
+        frame.show()
+    return False
+
+def animating():
+    # something on the LEDs moves between logic steps
+    return effects.active() or game.state == "game_over"
+
 def game_tick():
-    game.tick()
-    if game.state == "game_over":
+    # one callback serves two clocks: logic steps on _next_step_at, and while animating(),
+    # frames on _next_frame_at; otherwise a frame is only built after a step
+    global _next_step_at, _next_frame_at
+    now = time.monotonic()
+    if idle.idle and not idle_tick(now):
+        root.after(int(IDLE_POLL * 1000), game_tick)
+        return
+    t_start = time.perf_counter()
+    if _next_step_at is None:
+        _next_step_at = now
+        boot.mark("first tick")   # mainloop is up: the kiosk is playable
+        print(boot.summary())
+    game.process_inputs()
+    steps = 0
+    while now >= _next_step_at and steps < MAX_CATCHUP:
+        target = step_seconds()
+        tick_stats.record(now, _next_step_at, target)
+        t0 = time.perf_counter()
+        game.tick()
+        metrics.observe("snake_logic_tick_seconds", time.perf_counter() - t0)
+        _next_step_at += target
+        steps += 1
+    if now >= _next_step_at:
+        # too far behind to catch up; skip the backlog instead of spiralling
+        tick_stats.dropped += 1
+        _next_step_at = now + step_seconds()
+
+    moving = animating()
+    if steps or (moving and now >= _next_frame_at):
+        t0 = time.perf_counter()
+        render_frame()   # once per callback, however many logic steps ran
+        metrics.observe("snake_render_seconds", time.perf_counter() - t0)
+        _next_frame_at = now + 1.0 / FRAME_RATE
+    metrics.observe("snake_game_tick_seconds", time.perf_counter() - t_start)
+    wake_at = min(_next_step_at, _next_frame_at) if moving else _next_step_at
+    delay = int((wake_at - time.monotonic()) * 1000)
+    if idle_due(now):
+        enter_idle(now)
+        delay = int(IDLE_POLL * 1000)
+    root.after(max(1, delay), game_tick)
+
+def render_frame():
+    if effects.render(frame):
+        frame.show()
+    elif game.state == "game_over":
         game.draw_score_or_status()
     else:
         game.draw()
-    root.after(TICK, game_tick)
+
+def leds_off():
+    for strip in strips: strip.fill(BLACK); strip.show()
 
 def on_close():
     try:
-        pixels.fill(BLACK); pixels.show()
+        leds_off()
     finally:
         root.destroy()
 
-root.protocol("WM_DELETE_WINDOW", on_close)
-
-# Start
-random.seed()
-setup_gpio()
-apply_touch_toggle()  # set initial GUI based on toggle
-game.draw()
-root.after(TICK, game_tick)
-try:
-    root.mainloop()
-finally:
-    pixels.fill(BLACK); pixels.show()
\ No newline at end of file
+def start_metrics_server():
+    if not METRICS_PORT: return
+    try:
+        metrics.serve(METRICS_PORT)
+    except OSError as e:
+        print(f"metrics endpoint disabled: {e}")
+
+boot.mark("module")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="LED matrix Snake kiosk")
+    ap.add_argument("--replay", metavar="FILE", help="play a replay log on the LEDs first")
+    ap.add_argument("--led-process", action="store_true", default=LED_PROCESS,
+                    help="drive the LEDs from a separate process through shared memory")
+    ap.add_argument("--stream-port", type=int, default=STREAM_PORT, metavar="PORT",
+                    help="serve the spectator stream on this UDP port (0 = off)")
+    args = ap.parse_args(argv)
+    # light the start screen before anything slow: Tk, the admin UI and GPIO come after
+    init_leds(args.led_process)
+    boot.mark(f"leds ({led_backend})")
+    game.draw()
+    boot.mark("first frame")
+    threading.Thread(target=setup_gpio, name="gpio-setup", daemon=True).start()
+    random.seed()
+    build_gui()
+    apply_touch_toggle()  # set initial GUI based on toggle
+    boot.mark("gui")
+    start_metrics_server()
+    start_stream(args.stream_port)
+    if args.replay:
+        game.play_replay(Replay.load(args.replay))
+    root.after(TICK, game_tick)
+    try:
+        root.mainloop()
+    finally:
+        leds_off()
+        scores.close()
+        if stream: stream.close()
+        if driver: driver.close()
+
+if __name__ == "__main__":
+    main()
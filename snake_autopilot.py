@@ -0,0 +1,139 @@
+# snake_autopilot.py (self-playing Snake for attract mode: bitboard BFS + safety checks)
+# The board is an int with one bit per cell (bit c = cell y * w + x), so neighbour sets,
+# flood fills and reachability are a handful of shifts and masks per layer.
+import time
+from snake_core import DIRECTIONS, next_cell
+
+class Bitboard:
+    def __init__(self, w, h, wrap):
+        self.w, self.h, self.n, self.wrap = w, h, w * h, wrap
+        self.full = (1 << self.n) - 1
+        col0 = 0
+        for y in range(h): col0 |= 1 << (y * w)
+        self.col_first = col0
+        self.col_last = col0 << (w - 1)
+        self.row_first = (1 << w) - 1
+        self.row_last = self.row_first << (self.n - w)
+
+    def shift(self, b, d):
+        # every set cell moved one step in direction d (dx, dy)
+        w, n = self.w, self.n
+        dx, dy = d
+        if dx == 1:
+            out = (b & ~self.col_last) << 1
+            if self.wrap: out |= (b & self.col_last) >> (w - 1)
+        elif dx == -1:
+            out = (b & ~self.col_first) >> 1
+            if self.wrap: out |= (b & self.col_first) << (w - 1)
+        elif dy == 1:
+            out = (b & ~self.row_last) << w
+            if self.wrap: out |= (b & self.row_last) >> (n - w)
+        else:
+            out = b >> w
+            if self.wrap: out |= (b & self.row_first) << (n - w)
+        return out & self.full
+
+    def spread(self, b):
+        s = self.shift
+        return b | s(b, DIRECTIONS[0]) | s(b, DIRECTIONS[1]) | s(b, DIRECTIONS[2]) | s(b, DIRECTIONS[3])
+
+    def flood(self, start, open_cells, deadline=None):
+        # all cells of open_cells reachable from start (start itself included); None on timeout
+        seen = start
+        while True:
+            nxt = self.spread(seen) & (open_cells | start)
+            if nxt == seen: return seen
+            if deadline is not None and time.perf_counter() > deadline: return None
+            seen = nxt
+
+    def layers(self, start, open_cells, deadline=None):
+        # BFS rings out of start through open_cells; layers[k] = cells at distance k; None on timeout
+        rings = [start]
+        seen = start
+        while True:
+            ring = self.spread(rings[-1]) & open_cells & ~seen
+            if not ring: return rings
+            if deadline is not None and time.perf_counter() > deadline: return None
+            seen |= ring
+            rings.append(ring)
+
+class Autopilot:
+    # plan() returns a direction for the engine's next step, spending at most budget_s
+    def __init__(self, budget_s=0.03):
+        self.budget_s = budget_s
+        self._bb = None
+        self.plans = 0
+        self.fallbacks = 0
+
+    def _board(self, eng):
+        wrap = not eng.walls_enabled
+        bb = self._bb
+        if bb is None or (bb.w, bb.h, bb.wrap) != (eng.w, eng.h, wrap):
+            bb = self._bb = Bitboard(eng.w, eng.h, wrap)
+        return bb
+
+    def plan(self, eng):
+        deadline = time.perf_counter() + self.budget_s
+        self.plans += 1
+        bb = self._board(eng)
+        body = eng.body
+        head, tail, length = body.head(), body.tail(), len(body)
+        body_bits = 0
+        for i in range(length): body_bits |= 1 << body.at(i)
+        food_bits = 0
+        for c in eng.foods: food_bits |= 1 << c
+
+        # legal first moves: not a reversal, stays on the board, no body except the moving tail
+        cur = eng.pending
+        moves = []
+        for d in DIRECTIONS:
+            if (d[0] + cur[0], d[1] + cur[1]) == (0, 0): continue
+            c = next_cell(eng, head, d)
+            if c is None: continue
+            if (body_bits >> c) & 1 and c != tail: continue
+            moves.append((d, c))
+        if not moves: return None
+        cheap = moves[0][0]
+        for d, c in moves:
+            if d == cur: cheap = d   # keep going straight if nothing better turns up
+
+        def safe_after(c):
+            # after stepping onto c, can the new head still reach the tail?
+            new_tail = body.at(length - 2) if length > 1 else c
+            occupied = (body_bits & ~(1 << tail)) | (1 << c)
+            if c in eng.foods: occupied |= 1 << tail; new_tail = tail   # growing: tail stays
+            open_cells = bb.full & ~occupied | (1 << new_tail)
+            reach = bb.flood(1 << c, open_cells, deadline)
+            if reach is None: return None
+            return (reach >> new_tail) & 1, bin(reach).count("1")
+
+        # 1) shortest path to the nearest apple: BFS rings out of the apples, step down a ring
+        if food_bits:
+            open_cells = bb.full & ~body_bits | (1 << tail)
+            rings = bb.layers(food_bits, open_cells, deadline)
+            if rings is None:
+                self.fallbacks += 1
+                return cheap
+            best = None
+            for d, c in moves:
+                for k, ring in enumerate(rings):
+                    if (ring >> c) & 1:
+                        if best is None or k < best[0]: best = (k, d, c)
+                        break
+            if best is not None:
+                res = safe_after(best[2])
+                if res is None:
+                    self.fallbacks += 1
+                    return best[1]   # out of time: the apple move is legal, take it unverified
+                if res[0]: return best[1]
+
+        # 2) no safe apple path: keep the tail reachable, prefer the roomiest move
+        scored = []
+        for d, c in moves:
+            res = safe_after(c)
+            if res is None:
+                self.fallbacks += 1
+                return cheap
+            scored.append((res[0], res[1], d == cur, d))
+        scored.sort(key=lambda t: (t[0], t[1], t[2]), reverse=True)
+        return scored[0][3]
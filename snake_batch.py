@@ -0,0 +1,163 @@
+# snake_batch.py (vectorized batch simulator: thousands of independent boards per NumPy step)
+# Same rules as snake_core.SnakeEngine: wrap or walls, hitting yourself ends the game, moving
+# into the cell the tail is leaving is allowed, apples respawn on a random free cell, a full
+# board is a win. Needs numpy; the kiosk itself never imports this.
+#
+#   python snake_batch.py --boards 10000 --ticks 2000 --walls
+import argparse, time
+import numpy as np
+
+# direction index -> (dx, dy), same mapping as snake_core: UP, DOWN, LEFT, RIGHT
+DX = np.array([0, 0, 1, -1], dtype=np.int32)
+DY = np.array([-1, 1, 0, 0], dtype=np.int32)
+OPPOSITE = np.array([1, 0, 3, 2], dtype=np.int8)
+UP_I, DOWN_I, LEFT_I, RIGHT_I = 0, 1, 2, 3
+
+# end reasons
+ALIVE, WALL, SELF, FULL = 0, 1, 2, 3
+REASONS = {WALL: "wall", SELF: "self", FULL: "full"}
+
+class BatchSnake:
+    def __init__(self, boards, w=16, h=16, walls_enabled=False, apples_total=1, seed=None):
+        self.b, self.w, self.h, self.n = boards, w, h, w * h
+        self.walls_enabled = walls_enabled
+        self.apples_total = apples_total
+        self.rng = np.random.default_rng(seed)
+        self.rows = np.arange(boards)
+        self.body = np.zeros((boards, self.n), dtype=np.int32)   # ring of cell ids per board
+        self.head_i = np.zeros(boards, dtype=np.int32)
+        self.length = np.zeros(boards, dtype=np.int32)
+        self.occ = np.zeros((boards, self.n), dtype=bool)
+        self.food = np.zeros((boards, self.n), dtype=bool)
+        self.dir = np.zeros(boards, dtype=np.int8)
+        self.alive = np.zeros(boards, dtype=bool)
+        self.ticks = np.zeros(boards, dtype=np.int64)
+        self.reason = np.zeros(boards, dtype=np.int8)
+        self.reset()
+
+    def reset(self, start_dir=LEFT_I):
+        # every board starts the way the kiosk does after a start_dir press (SnakeEngine.start_cells):
+        # head at (3, h/2), 3 long, tail trailing away from start_dir
+        dx, dy = int(DX[start_dir]), int(DY[start_dir])
+        cx, cy = 3, self.h // 2
+        start = np.array([((cy - k * dy) % self.h) * self.w + (cx - k * dx) % self.w for k in range(3)],
+                         dtype=np.int32)
+        self.body[:] = 0
+        self.body[:, :3] = start
+        self.head_i[:] = 0
+        self.length[:] = 3
+        self.occ[:] = False
+        self.occ[:, start] = True
+        self.food[:] = False
+        self.dir[:] = start_dir
+        self.alive[:] = True
+        self.ticks[:] = 0
+        self.reason[:] = ALIVE
+        self._spawn(self.rows)
+
+    def score(self):
+        return np.maximum(0, self.length - 3)
+
+    def heads(self):
+        return self.body[self.rows, self.head_i]
+
+    def _spawn(self, rows):
+        # top up apples on rows; one random free cell per pass (random keys, argmax over free)
+        for _ in range(self.apples_total):
+            need = rows[self.food[rows].sum(axis=1) < self.apples_total]
+            if need.size == 0: return
+            keys = self.rng.random((need.size, self.n))
+            keys[self.occ[need] | self.food[need]] = -1.0
+            pick = keys.argmax(axis=1)
+            has_free = keys[np.arange(need.size), pick] >= 0
+            self.food[need[has_free], pick[has_free]] = True
+
+    def turn(self, dirs):
+        # dirs: per-board direction index, or -1 for no input; reversals are ignored
+        dirs = np.asarray(dirs, dtype=np.int8)
+        ok = (dirs >= 0) & (dirs != OPPOSITE[self.dir]) & self.alive
+        self.dir[ok] = dirs[ok]
+
+    def step(self):
+        live = np.flatnonzero(self.alive)
+        if live.size == 0: return 0
+        w, h, n = self.w, self.h, self.n
+        head = self.body[live, self.head_i[live]]
+        d = self.dir[live]
+        nx = head % w + DX[d]
+        ny = head // w + DY[d]
+        if self.walls_enabled:
+            out = (nx < 0) | (nx >= w) | (ny < 0) | (ny >= h)
+            nx = np.clip(nx, 0, w - 1); ny = np.clip(ny, 0, h - 1)
+        else:
+            out = np.zeros(live.size, dtype=bool)
+            nx %= w; ny %= h
+        c = ny * w + nx
+        tail_i = (self.head_i[live] + self.length[live] - 1) % n
+        tail = self.body[live, tail_i]
+        hit = self.occ[live, c] & (c != tail) & ~out
+
+        dead = out | hit
+        self.alive[live[dead]] = False
+        self.reason[live[out]] = WALL
+        self.reason[live[hit]] = SELF
+
+        mv = ~dead
+        rows, c, tail, tail_i = live[mv], c[mv], tail[mv], tail_i[mv]
+        ate = self.food[rows, c]
+        grow = ~ate
+        self.occ[rows[grow], tail[grow]] = False            # tail leaves before the head arrives
+        self.length[rows[grow]] -= 1
+        self.head_i[rows] = (self.head_i[rows] - 1) % n
+        self.body[rows, self.head_i[rows]] = c
+        self.occ[rows, c] = True
+        self.length[rows] += 1
+        self.ticks[rows] += 1
+        eaters = rows[ate]
+        if eaters.size:
+            self.food[eaters, c[ate]] = False
+            self._spawn(eaters)
+            full = eaters[~self.food[eaters].any(axis=1)]
+            self.alive[full] = False
+            self.reason[full] = FULL
+        return live.size
+
+    def run(self, max_ticks, policy=None):
+        # policy(sim) -> per-board direction indices (-1 = keep going); None = random turns
+        stepped = 0
+        for _ in range(max_ticks):
+            if policy is not None: self.turn(policy(self))
+            else: self.turn(random_turns(self))
+            moved = self.step()
+            if not moved: break
+            stepped += moved
+        return stepped
+
+def random_turns(sim, p_turn=0.2):
+    dirs = sim.rng.integers(0, 4, size=sim.b, dtype=np.int8)
+    dirs[sim.rng.random(sim.b) >= p_turn] = -1
+    return dirs
+
+def main():
+    ap = argparse.ArgumentParser(description="Run many headless Snake boards at once")
+    ap.add_argument("--boards", type=int, default=10000)
+    ap.add_argument("--ticks", type=int, default=1000)
+    ap.add_argument("--apples", type=int, default=1)
+    ap.add_argument("--walls", action="store_true")
+    ap.add_argument("--turn-prob", type=float, default=0.2)
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args()
+
+    sim = BatchSnake(args.boards, walls_enabled=args.walls, apples_total=args.apples, seed=args.seed)
+    t0 = time.perf_counter()
+    stepped = sim.run(args.ticks, policy=lambda s: random_turns(s, args.turn_prob))
+    dt = time.perf_counter() - t0
+    scores = sim.score()
+    print(f"{args.boards} boards, {stepped} board-ticks in {dt:.2f} s ({stepped / max(dt, 1e-9):,.0f} ticks/s)")
+    print(f"score mean {scores.mean():.2f}  max {scores.max()}  ticks survived mean {sim.ticks.mean():.1f}")
+    for code, name in REASONS.items():
+        print(f"  {name:5s} {(sim.reason == code).sum()}")
+    print(f"  alive {sim.alive.sum()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,406 @@
+# snake_core.py (pure Snake rules: no LEDs, no Tk, no GPIO — safe to import anywhere)
+import random
+from array import array
+from collections import deque
+
+# Directions per requested mapping
+UP, DOWN = (0,-1), (0,1)
+LEFT, RIGHT = (1,0), (-1,0)
+DIRECTIONS = (UP, DOWN, LEFT, RIGHT)
+TURN_BUFFER = 3   # validated turns a player can queue ahead of the next steps
+
+# --- free-cell index: swap-remove array + position map, O(1) take/give/random pick ---
+class FreeCells:
+    def __init__(self, n):
+        self.n = n
+        self.reset()
+
+    def reset(self):
+        self.cells = list(range(self.n))   # free cell ids (cell = y * w + x), unordered
+        self.pos = list(range(self.n))     # cell -> index in self.cells, -1 when taken
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return self.pos[cell] >= 0
+
+    def take(self, cell):
+        i = self.pos[cell]
+        if i < 0: return
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[i] = last
+            self.pos[last] = i
+        self.pos[cell] = -1
+
+    def give(self, cell):
+        if self.pos[cell] >= 0: return
+        self.pos[cell] = len(self.cells)
+        self.cells.append(cell)
+
+    def canonicalize(self):
+        # sorted order, so the same free set + the same RNG seed always picks the same cells
+        self.cells.sort()
+        for i, c in enumerate(self.cells): self.pos[c] = i
+
+    def pick(self, rng=random):
+        return self.cells[rng.randrange(len(self.cells))]
+
+# --- snake body: fixed-capacity ring buffer of packed cells + occupancy bitmap ---
+# Moving pushes one cell at the head and pops one at the tail; nothing is allocated per tick.
+class SnakeBody:
+    __slots__ = ("cap", "cells", "occ", "head_i", "length")
+
+    def __init__(self, cap):
+        self.cap = cap
+        self.cells = array("H", bytes(2 * cap))   # ring of cell ids, head at head_i
+        self.occ = bytearray(cap)                 # 1 where the body covers a cell
+        self.head_i = 0
+        self.length = 0
+
+    def load(self, cells):
+        # cells head first
+        self.occ[:] = bytes(self.cap)
+        self.head_i = 0
+        self.length = 0
+        for c in reversed(cells): self.push_head(c)
+
+    def __len__(self):
+        return self.length
+
+    def __contains__(self, cell):
+        return self.occ[cell] == 1
+
+    def at(self, i):
+        # i-th segment from the head
+        return self.cells[(self.head_i + i) % self.cap]
+
+    def head(self):
+        return self.cells[self.head_i]
+
+    def tail(self):
+        return self.cells[(self.head_i + self.length - 1) % self.cap]
+
+    def push_head(self, cell):
+        self.head_i = (self.head_i - 1) % self.cap
+        self.cells[self.head_i] = cell
+        self.occ[cell] = 1
+        self.length += 1
+
+    def pop_tail(self):
+        self.length -= 1
+        cell = self.cells[(self.head_i + self.length) % self.cap]
+        self.occ[cell] = 0
+        return cell
+
+# --- rules shared by both engines ---
+def next_cell(eng, head, d):
+    # the cell one step from head in direction d; None when a wall is in the way
+    y, x = divmod(head, eng.w)
+    nx, ny = x + d[0], y + d[1]
+    if eng.walls_enabled:
+        if nx < 0 or nx >= eng.w or ny < 0 or ny >= eng.h: return None
+    else:
+        nx %= eng.w; ny %= eng.h
+    return ny * eng.w + nx
+
+def spawn_foods(eng):
+    # constant time per apple; stops early when the board has no free cells left
+    while len(eng.foods) < eng.apples_total and eng.free:
+        c = eng.free.pick(eng.rng)
+        eng.free.take(c)
+        eng.foods.add(c)
+
+def queue_turn(turns, pending, d):
+    # queue d behind earlier turns; checked against the direction the snake will have by
+    # then, so a fast double-turn (e.g. a U-turn) survives instead of overwriting itself
+    last = turns[-1] if turns else pending
+    if d == last or (last[0] + d[0], last[1] + d[1]) == (0,0): return False
+    if len(turns) >= TURN_BUFFER: return False
+    turns.append(d)
+    return True
+
+# --- rules engine ---
+# States: "waiting_start" -> "running" -> "game_over". The kiosk layer (snakeGame.GameSnake)
+# subclasses this and adds drawing, timers, high score and the score-screen hold.
+class SnakeEngine:
+    __slots__ = ("w", "h", "n", "rng", "walls_enabled", "apples_total", "state", "direction",
+                 "pending", "turns", "body", "foods", "free", "end_reason", "ticks", "seed")
+
+    def __init__(self, w=16, h=16, walls_enabled=False, apples_total=1, rng=None):
+        self.w, self.h = w, h
+        self.n = w * h
+        self.rng = rng if rng is not None else random.Random()
+        self.seed = None                   # seed the current run was started with, if any
+        self.walls_enabled = walls_enabled
+        self.apples_total = apples_total
+        self.body = SnakeBody(self.n)
+        self.foods = set()                 # apple cells
+        self.turns = deque()               # queued turns, one consumed per step
+        self.free = FreeCells(self.n)      # cells holding neither snake nor food
+        SnakeEngine.reset(self)            # not self.reset(): subclasses draw/notify there
+
+    def cell(self, x, y):
+        return y * self.w + x
+
+    def start_cells(self, d=RIGHT):
+        # 3-long snake with its head at (3, h/2), tail trailing away from d
+        cx, cy = 3, self.h // 2
+        if d == LEFT:   s = [(cx,cy),(cx-1,cy),(cx-2,cy)]
+        elif d == UP:   s = [(cx,cy),(cx,cy+1),(cx,cy+2)]
+        elif d == DOWN: s = [(cx,cy),(cx,cy-1),(cx,cy-2)]
+        else:           s = [(cx,cy),(cx+1,cy),(cx+2,cy)]
+        return [self.cell(x % self.w, y % self.h) for (x,y) in s]
+
+    def reset(self):
+        self.state = "waiting_start"
+        self.direction = RIGHT
+        self.pending = RIGHT
+        self.turns.clear()
+        self.end_reason = None
+        self.ticks = 0
+        self.foods.clear()
+        self.free.reset()
+        start = [self.cell(x, self.h // 2) for x in (3, 2, 1)]
+        self.body.load(start)
+        for c in start: self.free.take(c)
+        self._spawn_foods()
+
+    def score(self):
+        return max(0, len(self.body) - 3)
+
+    def board_full(self):
+        return not self.foods and not self.free
+
+    def _spawn_foods(self):
+        spawn_foods(self)
+
+    def set_foods(self, cells):
+        # replace the apples with exactly these cells (replays restore the board this way)
+        for c in self.foods: self.free.give(c)
+        self.foods.clear()
+        for c in cells:
+            if c in self.body: continue
+            self.foods.add(c)
+            self.free.take(c)
+
+    def _place_body(self, cells):
+        # swap the whole body for cells (head first), keeping the free index in step
+        body = self.body
+        for i in range(len(body)): self.free.give(body.at(i))
+        body.load(cells)
+        for c in cells:
+            self.foods.discard(c)   # re-oriented onto an apple
+            self.free.take(c)
+
+    def _orient_start(self, d):
+        self._place_body(self.start_cells(d))
+        self._spawn_foods()
+
+    def start(self, d, seed=None):
+        # first input of a run: LEFT/UP/DOWN orient the snake and go; RIGHT is ignored.
+        # With a seed, every apple from here on is reproducible (see snake_replay).
+        if self.state != "waiting_start" or d == RIGHT:
+            return False
+        if seed is not None:
+            self.seed = seed
+            self.rng.seed(seed)
+            self.free.canonicalize()
+        self.direction = self.pending = d   # so an instant opposite press can't reverse into the body
+        self._orient_start(d)
+        self.state = "running"
+        return True
+
+    def turn(self, d):
+        if self.state != "running": return False
+        return queue_turn(self.turns, self.pending, d)
+
+    def _move(self):
+        if self.turns: self.pending = self.turns.popleft()
+        self.direction = d = self.pending
+        body = self.body
+        c = next_cell(self, body.head(), d)
+        if c is None:
+            self.end_reason = "wall"
+            return False
+        if body.occ[c] and c != body.tail():
+            self.end_reason = "self"
+            return False
+        ate = c in self.foods
+        if ate:
+            self.foods.remove(c)   # apple cell is already out of the free index
+        else:
+            self.free.give(body.pop_tail())
+        body.push_head(c)
+        self.free.take(c)
+        if ate:
+            self._spawn_foods()
+        return True
+
+    def step(self):
+        # one logic step of a running game
+        if self.state != "running": return
+        self.ticks += 1
+        if not self._move():
+            self._death(); return
+        if self.board_full():
+            self.end_reason = "full"
+            self._round_end()   # filled the board: a win
+
+    def _death(self):
+        self.state = "game_over"
+
+    def _round_end(self):
+        self.state = "game_over"
+
+# --- multi-snake rules: 2-4 snakes sharing one board ---
+# One shared grid says who owns each cell (0 = nobody, k + 1 = snake k), so walls, bodies,
+# head-to-head and apple spawning cost O(1) per moving head, however long the bodies get.
+class PlayerSnake:
+    __slots__ = ("id", "body", "direction", "pending", "turns", "alive", "score", "end_reason")
+
+    def __init__(self, k, n):
+        self.id = k
+        self.body = SnakeBody(n)
+        self.turns = deque()
+
+class MultiSnakeEngine:
+    __slots__ = ("w", "h", "n", "rng", "walls_enabled", "apples_total", "state", "snakes", "grid",
+                 "foods", "free", "end_reason", "winner", "ticks", "seed")
+
+    def __init__(self, players=2, w=16, h=16, walls_enabled=False, apples_total=1, rng=None):
+        self.w, self.h = w, h
+        self.n = w * h
+        self.rng = rng if rng is not None else random.Random()
+        self.seed = None
+        self.walls_enabled = walls_enabled
+        self.apples_total = apples_total
+        self.snakes = [PlayerSnake(k, self.n) for k in range(players)]
+        self.grid = bytearray(self.n)      # owner of each cell: 0 = free/apple, k + 1 = snake k
+        self.foods = set()
+        self.free = FreeCells(self.n)      # cells holding neither snake nor food
+        MultiSnakeEngine.reset(self)
+
+    def start_cells(self, k):
+        # even players start on the left heading +x, odd ones on the right heading -x, one row each
+        y = (k + 1) * self.h // (len(self.snakes) + 1)
+        if k % 2 == 0: return [y * self.w + x for x in (3, 2, 1)], LEFT
+        x0 = self.w - 4
+        return [y * self.w + x for x in (x0, x0 + 1, x0 + 2)], RIGHT
+
+    def reset(self):
+        self.state = "waiting_start"
+        self.end_reason = self.winner = None
+        self.ticks = 0
+        self.grid[:] = bytes(self.n)
+        self.foods.clear()
+        self.free.reset()
+        for s in self.snakes:
+            cells, d = self.start_cells(s.id)
+            s.body.load(cells)
+            for c in cells:
+                self.grid[c] = s.id + 1
+                self.free.take(c)
+            s.direction = s.pending = d
+            s.turns.clear()
+            s.alive = True
+            s.score = 0
+            s.end_reason = None
+        self._spawn_foods()
+
+    def score(self, k=None):
+        # one player's score, or the best one
+        if k is not None: return self.snakes[k].score
+        return max(s.score for s in self.snakes)
+
+    def alive(self):
+        return [s for s in self.snakes if s.alive]
+
+    def _spawn_foods(self):
+        spawn_foods(self)
+
+    def start(self, seed=None):
+        if self.state != "waiting_start": return False
+        if seed is not None:
+            self.seed = seed
+            self.rng.seed(seed)
+            self.free.canonicalize()
+        self.state = "running"
+        return True
+
+    def turn(self, k, d):
+        s = self.snakes[k]
+        if self.state != "running" or not s.alive: return False
+        return queue_turn(s.turns, s.pending, d)
+
+    def step(self):
+        if self.state != "running": return
+        self.ticks += 1
+        grid, foods = self.grid, self.foods
+        moves, dead = [], []
+        claims = {}                 # target cell -> number of heads moving there
+        for s in self.snakes:
+            if not s.alive: continue
+            if s.turns: s.pending = s.turns.popleft()
+            s.direction = s.pending
+            c = next_cell(self, s.body.head(), s.pending)
+            if c is None:
+                dead.append((s, "wall")); continue
+            moves.append((s, c))
+            claims[c] = claims.get(c, 0) + 1
+
+        # a tail moves out this tick unless its snake is eating, so following a tail is legal
+        leaving = {s.body.tail() for s, c in moves if c not in foods}
+        heads = {s.body.head() for s, _c in moves}
+        live = []
+        for s, c in moves:
+            if claims[c] > 1 or c in heads: dead.append((s, "head"))
+            elif grid[c] and c not in leaving:
+                dead.append((s, "self" if grid[c] == s.id + 1 else "crash"))
+            else: live.append((s, c))
+
+        # tails first, then the dead, then the new heads, so a cell can change hands in one tick
+        for s, c in live:
+            if c not in foods:
+                t = s.body.pop_tail()
+                grid[t] = 0
+                self.free.give(t)
+        lost = []                   # (snake, the cells its body covered) for _death
+        for s, reason in dead:
+            body = s.body
+            cells = [body.at(i) for i in range(len(body))]
+            for c in cells:
+                grid[c] = 0
+                self.free.give(c)
+            body.load([])
+            s.alive = False
+            s.end_reason = reason
+            lost.append((s, cells))
+        ate = False
+        for s, c in live:
+            if c in foods:
+                foods.remove(c)
+                s.score += 1
+                ate = True
+            s.body.push_head(c)
+            grid[c] = s.id + 1
+            self.free.take(c)
+        if ate: self._spawn_foods()
+
+        for s, cells in lost: self._death(s, cells)
+        survivors = self.alive()
+        if len(survivors) <= (1 if len(self.snakes) > 1 else 0):
+            self.winner = survivors[0] if survivors else None
+            self.end_reason = "last" if survivors else "draw"
+            self._round_end()
+        elif not foods and not self.free:
+            self.end_reason = "full"
+            self._round_end()
+
+    def _death(self, s, cells):
+        # s crashed; cells is where its body was (already free again)
+        pass
+
+    def _round_end(self):
+        self.state = "game_over"
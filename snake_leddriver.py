@@ -0,0 +1,155 @@
+# snake_leddriver.py (LED output in its own process: shared-memory double buffer + driver loop)
+# The game writes finished RGBW frames (brightness/gamma already applied) into one of two slots
+# and then bumps `latest`. A driver process owns the NeoPixel strips and, at its own cadence,
+# pushes the newest complete frame. Neither side waits for the other: the game never sits in
+# show(), Tk never delays the LEDs, and a frame the driver had no slot for is counted as dropped.
+#
+# Shared block: CONTROL, then two slots of n * 4 bytes (slot = seq % 2). Frame seq + 1 is
+# written into the other slot before `latest` becomes seq + 1, and the slot of seq is only
+# reused after that, for seq + 2. So the driver copies slot[latest % 2] and re-reads `latest`:
+# unchanged means the copy is whole; any change means it may be torn, and it is discarded.
+import struct, time
+
+CONTROL = struct.Struct("<IIIIIII")   # latest, stop, backend, shown, dropped, late, show_us
+LATEST, STOP, BACKEND, SHOWN, DROPPED, LATE, SHOW_US = (4 * i for i in range(7))
+BACKENDS = {0: "starting", 1: "neopixel", 2: "software"}
+DRIVER_HZ = 50          # driver polls for a new frame this often
+_U32 = struct.Struct("<I")
+_unpack_pixels = struct.Struct("4B").iter_unpack
+
+def scale_rgbw(src, tables):
+    # one translate per channel; tables = four 256-byte tables for R, G, B, W
+    out = bytearray(len(src))
+    for ch, table in enumerate(tables):
+        out[ch::4] = src[ch::4].translate(table)
+    return out
+
+def strip_writer(strip, tables=lambda: None):
+    # write(src, a, b): put src[a:b] (RGBW, scaled by tables() unless it returns None) into
+    # strip without pushing. Adafruit pixel buffers get the bytes straight into the buffer show()
+    # transmits, already in the strip's byte order; anything else gets pixel tuples.
+    raw = getattr(strip, "_post_brightness_buffer", None)
+    order = getattr(strip, "_byteorder", None)
+    if raw is not None and order is not None and len(order) == 4 and not getattr(strip, "_dotstar_mode", True):
+        off = strip._offset
+        end = off + len(strip) * 4
+        def write(src, a, b):
+            t = tables()
+            for ch in range(4):
+                chunk = src[a + ch:b:4]
+                raw[off + order[ch]:end:4] = chunk.translate(t[ch]) if t else chunk
+        return write
+    def write(src, a, b):
+        t = tables()
+        data = src[a:b]
+        strip[:] = list(_unpack_pixels(scale_rgbw(data, t) if t else data))
+    return write
+
+class DriverLink:
+    # game-process end; to FrameBuffer it looks like one strip spanning the whole frame
+    def __init__(self, n, outputs, order, hz=DRIVER_HZ):
+        # outputs: [(pin name, first pixel, pixel count)] in frame order
+        from multiprocessing import get_all_start_methods, get_context, shared_memory   # only when used
+        self.n = n
+        self.size = n * 4
+        self.shm = shared_memory.SharedMemory(create=True, size=CONTROL.size + 2 * self.size)
+        self.shm.buf[:CONTROL.size] = bytes(CONTROL.size)
+        self.seq = 0
+        # fork before Tk or any thread exists (init_leds runs first); spawn elsewhere
+        ctx = get_context("fork" if "fork" in get_all_start_methods() else "spawn")
+        self.proc = ctx.Process(target=driver_main, args=(self.shm, n, outputs, order, hz),
+                                name="led-driver", daemon=True)
+        self.proc.start()
+
+    def __len__(self):
+        return self.n
+
+    def write_frame(self, data):
+        o = CONTROL.size + ((self.seq + 1) & 1) * self.size
+        self.shm.buf[o:o + self.size] = data
+
+    def show(self):
+        # publish the slot write_frame just filled
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        _U32.pack_into(self.shm.buf, LATEST, self.seq)
+
+    def fill(self, color):
+        self.write_frame(bytes(color) * self.n)
+
+    def stats(self):
+        _latest, _stop, backend, shown, dropped, late, show_us = CONTROL.unpack_from(self.shm.buf)
+        return {"backend": BACKENDS.get(backend, "?"), "alive": self.proc.is_alive(), "shown": shown,
+                "dropped": dropped, "late": late, "show_ms": show_us / 1000}
+
+    def close(self, timeout=2.0):
+        # the driver blanks the strips on the way out
+        _U32.pack_into(self.shm.buf, STOP, 1)
+        self.proc.join(timeout)
+        if self.proc.is_alive(): self.proc.terminate()
+        self.shm.close()
+        self.shm.unlink()
+
+class _NullStrip:
+    # driver process without LED hardware: frames are accepted and discarded
+    def __init__(self, n): self.n = n
+    def __len__(self): return self.n
+    def __setitem__(self, i, v): pass
+    def fill(self, color): pass
+    def show(self): pass
+    def deinit(self): pass
+
+def _open_strips(outputs, order):
+    try:
+        import board, neopixel
+    except Exception as e:
+        print(f"LED driver process: no LED driver ({e}); frames are discarded")
+        return [_NullStrip(count) for _pin, _first, count in outputs], 2
+    strips = []
+    for pin, _first, count in outputs:
+        try:
+            strips.append(neopixel.NeoPixel(getattr(board, pin) if isinstance(pin, str) else pin, count,
+                                            pixel_order=order, auto_write=False, brightness=1.0))
+        except Exception as e:
+            print(f"LED driver process: output {pin} unavailable ({e})")
+            strips.append(_NullStrip(count))
+    return strips, 1
+
+def driver_main(shm, n, outputs, order, hz):
+    buf = shm.buf
+    size = n * 4
+    strips, backend = _open_strips(outputs, order)
+    _U32.pack_into(buf, BACKEND, backend)
+    writers = [(strip_writer(s), first * 4, (first + count) * 4) for s, (_p, first, count) in zip(strips, outputs)]
+    sent = [None] * len(writers)     # last bytes pushed per output
+    period = 1.0 / hz
+    shown = dropped = late = 0
+    next_at = time.monotonic()
+    try:
+        while not _U32.unpack_from(buf, STOP)[0]:
+            now = time.monotonic()
+            if now < next_at: time.sleep(next_at - now)
+            deadline = next_at + period
+            next_at = max(next_at + period, time.monotonic())   # no catch-up bursts after a stall
+            seq = _U32.unpack_from(buf, LATEST)[0]
+            if seq == shown: continue
+            o = CONTROL.size + (seq & 1) * size
+            frame = bytes(buf[o:o + size])
+            if _U32.unpack_from(buf, LATEST)[0] != seq:
+                next_at = time.monotonic()   # maybe torn: take the newer frame right away
+                continue
+            if shown: dropped += ((seq - shown) & 0xFFFFFFFF) - 1
+            t0 = time.monotonic()
+            for i, (write, a, b) in enumerate(writers):
+                part = frame[a:b]
+                if part != sent[i]:
+                    write(frame, a, b)
+                    strips[i].show()
+                    sent[i] = part
+            t1 = time.monotonic()
+            if t1 > deadline: late += 1
+            shown = seq
+            struct.pack_into("<IIII", buf, SHOWN, shown, dropped, late, int((t1 - t0) * 1e6))
+    finally:
+        for s in strips:
+            try: s.fill((0, 0, 0, 0)); s.show(); s.deinit()
+            except Exception: pass
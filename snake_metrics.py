@@ -0,0 +1,103 @@
+# snake_metrics.py (low-overhead counters + latency histograms, served as Prometheus text)
+import bisect, threading
+from collections import deque
+
+# seconds; spans sub-millisecond logic up to a badly late 120 ms frame
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.12, 0.25, 0.5, 1.0)
+
+class Histogram:
+    # cumulative buckets for Prometheus plus a rolling window for on-device percentiles
+    def __init__(self, name, help, buckets=DEFAULT_BUCKETS, window=512):
+        self.name, self.help = name, help
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, v):
+        self.counts[bisect.bisect_left(self.buckets, v)] += 1
+        self.sum += v
+        self.count += 1
+        self.recent.append(v)
+
+    def quantiles(self, qs=(0.5, 0.99)):
+        ordered = sorted(self.recent)
+        if not ordered: return [0.0 for _ in qs]
+        return [ordered[min(len(ordered) - 1, int(len(ordered) * q))] for q in qs]
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}      # name -> [help, value]
+        self.gauges = {}        # name -> (help, fn) evaluated at scrape time
+        self.histograms = {}    # name -> Histogram
+        self._server = None
+
+    def counter(self, name, help):
+        self.counters.setdefault(name, [help, 0])
+
+    def inc(self, name, k=1):
+        with self._lock:
+            self.counters[name][1] += k
+
+    def gauge(self, name, help, fn):
+        self.gauges[name] = (help, fn)
+
+    def histogram(self, name, help, buckets=DEFAULT_BUCKETS):
+        return self.histograms.setdefault(name, Histogram(name, help, buckets))
+
+    def observe(self, name, v):
+        with self._lock:
+            self.histograms[name].observe(v)
+
+    def snapshot(self):
+        # (counters, gauges, {name: (count, p50, p99)}) for the admin Diagnostics tab
+        with self._lock:
+            counters = {k: v for k, (_h, v) in self.counters.items()}
+            hists = {k: (h.count, *h.quantiles()) for k, h in self.histograms.items()}
+        gauges = {}
+        for k, (_h, fn) in self.gauges.items():
+            try: gauges[k] = fn()
+            except Exception: pass
+        return counters, gauges, hists
+
+    def render_prometheus(self):
+        out = []
+        with self._lock:
+            for name, (help, v) in self.counters.items():
+                out += [f"# HELP {name} {help}", f"# TYPE {name} counter", f"{name} {v}"]
+            for name, h in self.histograms.items():
+                out += [f"# HELP {name} {h.help}", f"# TYPE {name} histogram"]
+                acc = 0
+                for le, c in zip(h.buckets, h.counts):
+                    acc += c
+                    out.append(f'{name}_bucket{{le="{le}"}} {acc}')
+                out.append(f'{name}_bucket{{le="+Inf"}} {h.count}')
+                out.append(f"{name}_sum {h.sum}")
+                out.append(f"{name}_count {h.count}")
+        for name, (help, fn) in self.gauges.items():
+            try: v = fn()
+            except Exception: continue
+            out += [f"# HELP {name} {help}", f"# TYPE {name} gauge", f"{name} {v}"]
+        return "\n".join(out) + "\n"
+
+    def serve(self, port, host="127.0.0.1"):
+        # GET /metrics on a daemon thread; scraping never runs on the game thread
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer   # off the boot path
+        metrics = self
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404); return
+                body = metrics.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            def log_message(self, *_a): pass
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        return self._server
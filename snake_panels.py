@@ -0,0 +1,91 @@
+# snake_panels.py (LED panel layouts: any number of matrix panels -> one logical W x H grid)
+# Each panel sits at (x0, y0) in the grid with a rotation, an optional mirror and its own
+# wiring (serpentine or progressive, rows or columns). Panels that share a data pin are
+# chained in list order. compile() folds all of it into one lookup table, so drawing costs
+# the same per cell however many panels there are.
+#
+#   layout = PanelLayout([Panel(0, 0), Panel(16, 0, rotate=180)])          # 32x16, one chain
+#   layout = PanelLayout(tiled(2, 2, pins=["D18", "D21", "D24", "D12"]))   # 32x32, pin per panel
+
+class Panel:
+    __slots__ = ("x0", "y0", "w", "h", "rotate", "flip_x", "serpentine", "vertical", "pin")
+
+    def __init__(self, x0=0, y0=0, w=16, h=16, rotate=0, flip_x=False, serpentine=True,
+                 vertical=False, pin=None):
+        if rotate not in (0, 90, 180, 270): raise ValueError(f"rotate must be 0/90/180/270, got {rotate}")
+        self.x0, self.y0, self.w, self.h = x0, y0, w, h   # w x h as wired, before rotation
+        self.rotate, self.flip_x = rotate, flip_x
+        self.serpentine, self.vertical = serpentine, vertical
+        self.pin = pin            # None = the layout's default pin
+
+    @property
+    def size(self):
+        # footprint in the grid
+        return (self.h, self.w) if self.rotate in (90, 270) else (self.w, self.h)
+
+    def led(self, x, y):
+        # (x, y) inside the footprint -> LED number along this panel's data line
+        fw, fh = self.size
+        if self.flip_x: x = fw - 1 - x
+        w, h, r = self.w, self.h, self.rotate
+        if r == 0:     u, v = x, y
+        elif r == 90:  u, v = y, h - 1 - x           # panel turned clockwise
+        elif r == 180: u, v = w - 1 - x, h - 1 - y
+        else:          u, v = w - 1 - y, x
+        if self.vertical:
+            if self.serpentine and u % 2: v = h - 1 - v
+            return u * h + v
+        if self.serpentine and v % 2: u = w - 1 - u
+        return v * w + u
+
+def tiled(cols, rows, w=16, h=16, pins=None, **panel_kw):
+    # cols x rows identical panels, row by row; one chain, or one pin per panel if pins is given
+    if pins is not None and len(pins) != cols * rows:
+        raise ValueError(f"need {cols * rows} pins, got {len(pins)}")
+    return [Panel(c * w, r * h, w, h, pin=pins[r * cols + c] if pins else None, **panel_kw)
+            for r in range(rows) for c in range(cols)]
+
+def parse_tiling(spec):
+    # "2x2" -> (2, 2)
+    cols, _, rows = spec.lower().partition("x")
+    return int(cols), int(rows or cols)
+
+class PanelLayout:
+    def __init__(self, panels, default_pin=None):
+        self.panels = list(panels)
+        self.w = max(p.x0 + p.size[0] for p in self.panels)
+        self.h = max(p.y0 + p.size[1] for p in self.panels)
+        self.n = self.w * self.h
+        # outputs: [pin, first pixel, pixel count, panels in chain order], in first-seen pin order
+        self.outputs = []
+        by_pin = {}
+        for p in self.panels:
+            pin = default_pin if p.pin is None else p.pin
+            if pin not in by_pin:
+                by_pin[pin] = [pin, 0, 0, []]
+                self.outputs.append(by_pin[pin])
+            by_pin[pin][3].append(p)
+            by_pin[pin][2] += p.w * p.h
+        start = 0
+        for out in self.outputs:
+            out[1] = start
+            start += out[2]
+
+    def compile(self):
+        # cell (y * W + x) -> pixel offset in one frame holding every output back to back
+        table = [-1] * self.n
+        for _pin, first, _count, chain in self.outputs:
+            base = first
+            for p in chain:
+                fw, fh = p.size
+                for y in range(fh):
+                    row = (p.y0 + y) * self.w + p.x0
+                    for x in range(fw):
+                        if table[row + x] != -1:
+                            raise ValueError(f"panels overlap at ({p.x0 + x}, {p.y0 + y})")
+                        table[row + x] = base + p.led(x, y)
+                base += p.w * p.h
+        if -1 in table:
+            c = table.index(-1)
+            raise ValueError(f"no panel covers ({c % self.w}, {c // self.w})")
+        return table
@@ -0,0 +1,110 @@
+# snake_profiler.py (on-demand sampling profiler: every thread, collapsed stacks on disk)
+# A daemon thread wakes every `interval` and walks sys._current_frames(), so the Tk mainloop
+# (and game_tick inside it), the gpiozero callback thread and any other thread are all sampled
+# without installing trace hooks; the game runs at full speed between samples. The capture is
+# written in the collapsed-stack format flamegraph.pl and speedscope read, one line per stack:
+#   thread;outer (file:line);...;leaf (file:line) count
+# Stacks parked in a blocking call (Tk waiting for events, Event/Condition.wait, select, sleep,
+# socket reads) get a final "[waiting]" frame and are left out of the hot-function summary,
+# which would otherwise be all helper threads sitting in wait().
+#
+#   prof = SamplingProfiler(); prof.start(30, "profiles")   # later: prof.summary()
+import linecache, os, re, sys, threading, time
+from collections import Counter
+
+# a leaf frame in one of these functions, or on a line calling one, is blocked rather than busy
+WAIT_FUNCS = {"wait", "select", "poll", "mainloop", "serve_forever", "_wait_for_tstate_lock", "accept"}
+_WAIT_CALL = re.compile(r"\b(select|poll|sleep|wait|recv|recvfrom|recv_into|accept|mainloop|serve_forever)\(")
+
+class SamplingProfiler:
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stacks = Counter()     # (thread name, frame keys outer -> leaf, waiting) -> samples
+        self.samples = 0
+        self._waits = {}            # (code, line) -> leaf there is blocked
+        self.path = None            # file written by the last capture
+        self.error = None
+        self.ends_at = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds, out_dir):
+        # False if a capture is already running
+        if self.running: return False
+        self.stacks = Counter()
+        self.samples = 0
+        self.path = self.error = None
+        self.ends_at = time.monotonic() + seconds
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(seconds, out_dir), name="profiler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        # end early; what was sampled so far is still written
+        self._stop.set()
+
+    def _run(self, seconds, out_dir):
+        me = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline and not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, f in sys._current_frames().items():
+                if ident == me: continue
+                waiting = self._waiting(f)
+                keys = []
+                while f is not None:
+                    code = f.f_code
+                    keys.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    f = f.f_back
+                keys.reverse()
+                self.stacks[names.get(ident, str(ident)), tuple(keys), waiting] += 1
+            self.samples += 1
+        try:
+            self.path = self._write(out_dir)
+        except OSError as e:
+            self.error = str(e)
+
+    def _waiting(self, f):
+        code = f.f_code
+        lineno = f.f_lineno or 0   # None while a frame is between lines
+        key = (code, lineno)
+        w = self._waits.get(key)
+        if w is None:
+            line = linecache.getline(code.co_filename, lineno) if lineno else ""
+            w = self._waits[key] = code.co_name in WAIT_FUNCS or bool(_WAIT_CALL.search(line))
+        return w
+
+    def _write(self, out_dir):
+        os.makedirs(out_dir, exist_ok=True)
+        path = os.path.join(out_dir, time.strftime("profile-%Y%m%d-%H%M%S.collapsed"))
+        with open(path, "w") as f:
+            for (thread, keys, waiting), n in self.stacks.most_common():
+                frames = (thread,) + keys + (("[waiting]",) if waiting else ())
+                f.write(";".join(frames).replace(" ", "_") + f" {n}\n")
+        return path
+
+    def summary(self, top=15):
+        # busy share per thread, then the hottest functions while busy; percentages are of
+        # wall time (samples), so a thread that never waits shows 100% on its own
+        busy, seen = Counter(), Counter()
+        own, total = Counter(), Counter()
+        for (thread, keys, waiting), n in self.stacks.items():
+            seen[thread] += n
+            if waiting or not keys: continue
+            busy[thread] += n
+            own[keys[-1]] += n
+            for k in set(keys): total[k] += n
+        all_n = self.samples or 1
+        lines = [f"{self.samples} samples ({self.interval * 1000:.0f} ms apart); % of wall time",
+                 f"{'busy%':>6s}  thread"]
+        for thread, n in sorted(seen.items(), key=lambda t: -busy[t[0]]):
+            lines.append(f"{100 * busy[thread] / all_n:6.1f}  {thread}")
+        lines.append(f"{'own%':>6s} {'total%':>6s}  function (busy samples only)")
+        for k, n in own.most_common(top):
+            lines.append(f"{100 * n / all_n:6.1f} {100 * total[k] / all_n:6.1f}  {k}")
+        return "\n".join(lines)
@@ -0,0 +1,170 @@
+# snake_replay.py (compact deterministic replay logs + headless fast-forward playback)
+# A run is fully determined by its RNG seed, its settings and the turns accepted at each
+# tick, so that is all a log stores. File layout (little-endian):
+#   header  HEADER struct below, then u8 apple count + u16 apple cells at the start press
+#   events  varint((tick_delta << 3) | code): code 0-3 = direction index, END = run over
+#   end     u8 reason index, u32 score (only after an END event)
+#
+#   python snake_replay.py replays/*.snk            # verify + fast-forward each log
+#   python snake_replay.py --bench 200 replays/a.snk
+import argparse, os, struct, time
+from snake_core import SnakeEngine, DIRECTIONS
+
+MAGIC = b"SNKR"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBBBHIBd")  # magic, version, w, h, flags, apples, timed_s, seed, start_dir, started_at
+FOOTER = struct.Struct("<BI")
+END = 4
+FLAG_WALLS, FLAG_TIMED = 1, 2
+REASONS = ("", "self", "wall", "full", "time")
+
+def _varint(v, out):
+    while v >= 0x80:
+        out.append((v & 0x7f) | 0x80)
+        v >>= 7
+    out.append(v)
+
+def _read_varint(data, i):
+    v = shift = 0
+    while True:
+        b = data[i]; i += 1
+        v |= (b & 0x7f) << shift
+        if b < 0x80: return v, i
+        shift += 7
+
+class ReplayRecorder:
+    def __init__(self):
+        self.buf = None
+        self._last_tick = 0
+
+    def begin(self, eng, start_dir, seed, timed_mode=False, timed_seconds=0):
+        # call just before eng.start(start_dir, seed): captures the apples already on the board
+        flags = (FLAG_WALLS if eng.walls_enabled else 0) | (FLAG_TIMED if timed_mode else 0)
+        self.buf = bytearray(HEADER.pack(MAGIC, VERSION, eng.w, eng.h, flags, eng.apples_total,
+                                         int(timed_seconds), seed, DIRECTIONS.index(start_dir), time.time()))
+        foods = sorted(eng.foods)
+        self.buf.append(len(foods))
+        self.buf += struct.pack(f"<{len(foods)}H", *foods)
+        self._last_tick = 0
+
+    def turn(self, tick, d):
+        if self.buf is None: return
+        _varint(((tick - self._last_tick) << 3) | DIRECTIONS.index(d), self.buf)
+        self._last_tick = tick
+
+    def finish(self, eng):
+        # close the log and hand back its bytes (None if nothing was being recorded)
+        if self.buf is None: return None
+        _varint(((eng.ticks - self._last_tick) << 3) | END, self.buf)
+        self.buf += FOOTER.pack(REASONS.index(eng.end_reason or ""), eng.score())
+        data, self.buf = bytes(self.buf), None
+        return data
+
+    def cancel(self):
+        self.buf = None
+
+class Replay:
+    def __init__(self, data):
+        (magic, version, self.w, self.h, flags, self.apples_total, self.timed_seconds, self.seed,
+         start_i, self.started_at) = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a Snake replay log (or an unsupported version)")
+        self.walls_enabled = bool(flags & FLAG_WALLS)
+        self.timed_mode = bool(flags & FLAG_TIMED)
+        self.start_dir = DIRECTIONS[start_i]
+        i = HEADER.size
+        count = data[i]
+        self.foods = list(struct.unpack_from(f"<{count}H", data, i + 1))
+        i += 1 + 2 * count
+        self.events = []          # (tick, direction) in order
+        self.end_tick = self.end_reason = self.score = None
+        tick = 0
+        while i < len(data):
+            v, i = _read_varint(data, i)
+            tick += v >> 3
+            code = v & 7
+            if code == END:
+                reason, self.score = FOOTER.unpack_from(data, i)
+                self.end_tick, self.end_reason = tick, REASONS[reason]
+                break
+            self.events.append((tick, DIRECTIONS[code]))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f: return cls(f.read())
+
+    def engine(self):
+        # a fresh engine at the moment just before the start press
+        eng = SnakeEngine(self.w, self.h, walls_enabled=self.walls_enabled, apples_total=self.apples_total)
+        eng.set_foods(self.foods)
+        return eng
+
+class ReplayPlayer:
+    # feeds a replay's turns into an engine, tick by tick
+    def __init__(self, replay):
+        self.replay = replay
+        self.restore = None    # caller's settings to put back when playback ends
+        self._i = 0
+
+    def feed(self, eng):
+        # queue the turns recorded for eng.ticks; False once the recorded run is over
+        events = self.replay.events
+        while self._i < len(events) and events[self._i][0] <= eng.ticks:
+            eng.turn(events[self._i][1])
+            self._i += 1
+        end = self.replay.end_tick
+        return not (end is not None and self.replay.end_reason == "time" and eng.ticks >= end)
+
+def run_headless(replay):
+    # fast-forward a whole run; returns the finished engine
+    eng = replay.engine()
+    eng.start(replay.start_dir, replay.seed)
+    player = ReplayPlayer(replay)
+    while eng.state == "running":
+        if not player.feed(eng):
+            eng.end_reason = "time"
+            eng._round_end()
+            break
+        eng.step()
+    return eng
+
+def save(data, directory, score):
+    os.makedirs(directory, exist_ok=True)
+    name = time.strftime("%Y%m%d-%H%M%S") + f"-s{score}.snk"
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f: f.write(data)
+    return path
+
+def prune(directory, keep):
+    # delete all but the newest `keep` logs (names start with their timestamp); returns how many went
+    try: logs = sorted(f for f in os.listdir(directory) if f.endswith(".snk"))
+    except OSError: return 0
+    gone = 0
+    for name in logs[:max(0, len(logs) - keep)]:
+        try:
+            os.remove(os.path.join(directory, name))
+            gone += 1
+        except OSError:
+            pass
+    return gone
+
+def main():
+    ap = argparse.ArgumentParser(description="Verify and fast-forward Snake replay logs")
+    ap.add_argument("logs", nargs="+")
+    ap.add_argument("--bench", type=int, default=1, help="replay each log N times and report ticks/s")
+    args = ap.parse_args()
+    bad = 0
+    for path in args.logs:
+        rep = Replay.load(path)
+        t0 = time.perf_counter()
+        for _ in range(args.bench): eng = run_headless(rep)
+        dt = time.perf_counter() - t0
+        ok = (eng.score(), eng.ticks, eng.end_reason or "") == (rep.score, rep.end_tick, rep.end_reason)
+        bad += not ok
+        print(f"{path}: recorded score {rep.score} @ tick {rep.end_tick} ({rep.end_reason}), "
+              f"replayed {eng.score()} @ tick {eng.ticks} ({eng.end_reason}) "
+              f"{'OK' if ok else 'MISMATCH'}  {eng.ticks * args.bench / max(dt, 1e-9):,.0f} ticks/s")
+    raise SystemExit(1 if bad else 0)
+
+if __name__ == "__main__":
+    main()
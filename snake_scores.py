@@ -0,0 +1,158 @@
+# snake_scores.py (persistent high score + top-N leaderboard, SD-card friendly)
+# Writes are appended to a JSON-lines journal by a background thread that batches them and
+# fsyncs once per batch. Every COMPACT_EVERY records the leaderboard is rewritten as a small
+# snapshot (tmp file + fsync + rename) and the journal starts over. Every record carries a
+# sequence number and the snapshot remembers the last one it contains, so a crash at any
+# point loads cleanly: torn journal lines are skipped and already-compacted ones ignored.
+import json, os, queue, threading, time
+
+COMPACT_EVERY = 200
+
+def _fsync_dir(path):
+    # make a rename in path's directory survive a power cut (no-op where directories can't be opened)
+    try: fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    except OSError: return
+    try: os.fsync(fd)
+    except OSError: pass
+    finally: os.close(fd)
+
+class ScoreStore:
+    def __init__(self, path, top_n=10, flush_interval=2.0, compact_every=COMPACT_EVERY):
+        self.journal_path = path + ".jsonl"
+        self.snapshot_path = path + ".json"
+        self.top_n = top_n
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._q = queue.Queue()
+        self._thread = None
+        self._since_compact = 0
+        self.seq = 0
+        self.entries = []      # best first: {"score", "t", "walls", "apples", "timed", "seq"}
+        self.high_score = 0
+        self.load()
+
+    # --- loading ---
+    def load(self):
+        snap_seq = 0
+        try:
+            with open(self.snapshot_path) as f: snap = json.load(f)
+            self.entries = snap.get("entries", [])
+            self.high_score = snap.get("high_score", 0)
+            self.seq = snap_seq = snap.get("seq", 0)
+        except (OSError, ValueError):
+            pass
+        try:
+            with open(self.journal_path, "rb") as f: data = f.read()
+        except OSError:
+            return
+        if data and not data.endswith(b"\n"):
+            # torn write from a power cut: drop the partial line so appends start clean
+            data = data[:data.rfind(b"\n") + 1]
+            try:
+                with open(self.journal_path, "r+b") as f: f.truncate(len(data))
+            except OSError:
+                pass
+        for line in data.splitlines():
+            try: rec = json.loads(line)
+            except ValueError: continue
+            if rec.get("seq", 0) <= snap_seq: continue
+            self._apply(rec)
+            self._since_compact += 1
+
+    def _apply(self, rec):
+        self.seq = max(self.seq, rec.get("seq", 0))
+        if rec.get("op") == "reset":
+            self.entries = []
+            self.high_score = 0
+            return
+        self.entries.append(rec)
+        self.entries.sort(key=lambda e: (-e["score"], e["t"]))
+        del self.entries[self.top_n:]
+        self.high_score = max(self.high_score, rec["score"])
+
+    # --- UI-thread API: in-memory update now, disk write later ---
+    def qualifies(self, score):
+        return score > 0 and (len(self.entries) < self.top_n or score > self.entries[-1]["score"])
+
+    def record(self, score, **settings):
+        # returns True if the score made the leaderboard
+        with self._lock:
+            if not self.qualifies(score): return False
+            self.seq += 1
+            rec = {"seq": self.seq, "score": int(score), "t": round(time.time(), 1), **settings}
+            self._apply(rec)
+        self._enqueue(rec)
+        return True
+
+    def reset(self):
+        with self._lock:
+            self.seq += 1
+            rec = {"seq": self.seq, "op": "reset", "t": round(time.time(), 1)}
+            self._apply(rec)
+        self._enqueue(rec)
+
+    def leaderboard(self):
+        with self._lock: return list(self.entries)
+
+    # --- writer thread ---
+    def _enqueue(self, rec):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._writer, name="score-store", daemon=True)
+            self._thread.start()
+        self._q.put(rec)
+
+    def _writer(self):
+        while True:
+            rec = self._q.get()
+            if rec is None: return
+            batch = [rec]
+            # gather whatever else arrives within flush_interval into the same fsync
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while True:
+                left = deadline - time.monotonic()
+                if left <= 0: break
+                try: nxt = self._q.get(timeout=left)
+                except queue.Empty: break
+                if nxt is None: stop = True; break
+                batch.append(nxt)
+            try:
+                self._append(batch)
+                if self._since_compact >= self.compact_every: self.compact()
+            except OSError as e:
+                print(f"score store write failed: {e}")
+            if stop: return
+
+    def _append(self, batch):
+        d = os.path.dirname(self.journal_path)
+        if d: os.makedirs(d, exist_ok=True)
+        with open(self.journal_path, "a") as f:
+            for rec in batch: f.write(json.dumps(rec, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._since_compact += len(batch)
+
+    def compact(self):
+        with self._lock:
+            snap = {"seq": self.seq, "high_score": self.high_score, "entries": list(self.entries)}
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(snap, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        _fsync_dir(self.snapshot_path)   # the rename must be durable before the journal empties
+        # journal records up to snap["seq"] are now redundant; a crash before this truncate
+        # is harmless because load() skips them by sequence number
+        with open(self.journal_path, "w") as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self._since_compact = 0
+
+    def close(self, timeout=5.0):
+        # flush pending writes (call on shutdown)
+        if self._thread is not None:
+            self._q.put(None)
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,195 @@
+# snake_stream.py (spectator stream: LED frames as UDP keyframes + deltas, never blocks the game)
+# Viewers subscribe by sending HELLO to the kiosk's stream port (and repeat it every couple of
+# seconds to stay subscribed). Each datagram is HEADER followed by
+#   key    w * h RGBW pixels in cell order (cell = y * w + x)
+#   delta  count x (u16 cell, RGBW) changed since the previous seq
+# A viewer that misses a seq ignores deltas until the next keyframe; its next HELLO asks for one.
+#
+#   python snake_stream.py kiosk.local            # terminal viewer
+#   python snake_stream.py kiosk.local --stats    # just frame/drop counters (for recorders)
+import argparse, select, socket, struct, sys, threading, time
+from array import array
+
+MAGIC = b"SNKS"
+HELLO = b"SNKH"
+VERSION = 1
+KEY, DELTA = 0, 1
+HEADER = struct.Struct("<4sBBHHIH")   # magic, version, kind, w, h, seq, count
+CELL = struct.Struct("<H4s")
+KEYFRAME_EVERY = 50     # frames between unconditional keyframes
+VIEWER_TTL = 10.0       # seconds a subscription lasts without a fresh HELLO
+MAX_VIEWERS = 8
+MAX_DATAGRAM = 65507
+
+class StreamPublisher:
+    # publish() is called on the game thread and only swaps in the newest frame; a sender thread
+    # diffs, encodes and sends it. If the sender falls behind, intermediate frames are skipped
+    # (deltas are always against what was last sent), and sockets are non-blocking, so a slow
+    # viewer loses datagrams instead of holding anything up.
+    def __init__(self, w, h, xy_table, port, host="0.0.0.0"):
+        if HEADER.size + w * h * 4 > MAX_DATAGRAM:
+            raise ValueError(f"a {w}x{h} keyframe does not fit in one datagram")
+        self.w, self.h, self.n = w, h, w * h
+        self.xy_table = xy_table
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.setblocking(False)
+        self.viewers = {}          # addr -> last HELLO (monotonic)
+        self._latest = None
+        self._wake = threading.Event()
+        self._key_wanted = True
+        self._stop = False
+        self.seq = 0
+        self.sent = self.dropped = self.keyframes = 0
+        threading.Thread(target=self._recv_loop, name="stream-recv", daemon=True).start()
+        threading.Thread(target=self._send_loop, name="stream-send", daemon=True).start()
+
+    def publish(self, buf):
+        # game thread: one copy of the frame, nothing else
+        self._latest = bytes(buf)
+        if self.viewers: self._wake.set()
+
+    def close(self):
+        self._stop = True
+        self._wake.set()
+        self.sock.close()
+
+    def _recv_loop(self):
+        while not self._stop:
+            try:
+                r, _w, _x = select.select([self.sock], [], [], 1.0)
+                if not r: continue
+                data, addr = self.sock.recvfrom(64)
+            except (OSError, ValueError):
+                if self._stop: return
+                continue
+            if data[:4] != HELLO: continue
+            if addr not in self.viewers and len(self.viewers) >= MAX_VIEWERS: continue
+            self.viewers[addr] = time.monotonic()
+            self._key_wanted = True
+            self._wake.set()
+
+    def _send_loop(self):
+        last = None
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._stop: return
+            now = time.monotonic()
+            for addr, seen in list(self.viewers.items()):
+                if now - seen > VIEWER_TTL: self.viewers.pop(addr, None)
+            raw = self._latest
+            if raw is None or not self.viewers: continue
+            src = array("I", raw)
+            cells = array("I", [src[o] for o in self.xy_table])   # strip order -> cell order
+            packet = self._encode(cells, last)
+            last = cells
+            for addr in list(self.viewers):
+                try:
+                    self.sock.sendto(packet, addr)
+                    self.sent += 1
+                except (BlockingIOError, InterruptedError):
+                    self.dropped += 1       # socket buffer full: this viewer misses a frame
+                except OSError:
+                    self.viewers.pop(addr, None)
+
+    def _encode(self, cells, last):
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        changed = None
+        if last is not None and not self._key_wanted and self.seq % KEYFRAME_EVERY:
+            changed = [i for i, (a, b) in enumerate(zip(cells, last)) if a != b]
+            if len(changed) * CELL.size >= self.n * 4: changed = None   # a keyframe is smaller
+        if changed is None:
+            self._key_wanted = False
+            self.keyframes += 1
+            return HEADER.pack(MAGIC, VERSION, KEY, self.w, self.h, self.seq, self.n) + cells.tobytes()
+        out = bytearray(HEADER.pack(MAGIC, VERSION, DELTA, self.w, self.h, self.seq, len(changed)))
+        raw = cells.tobytes()
+        for i in changed:
+            out += CELL.pack(i, raw[i * 4:i * 4 + 4])
+        return bytes(out)
+
+class StreamViewer:
+    # reference client: keeps an up-to-date RGBW frame (cell order) from the datagrams
+    def __init__(self, host, port, hello_every=2.0):
+        self.addr = (socket.gethostbyname(host), port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.hello_every = hello_every
+        self._hello_at = 0.0
+        self.w = self.h = 0
+        self.frame = None
+        self.seq = None            # None until the first keyframe (or after a gap)
+        self.frames = self.keyframes = self.gaps = 0
+
+    def hello(self):
+        self.sock.sendto(HELLO, self.addr)
+        self._hello_at = time.monotonic()
+
+    def poll(self, timeout=0.5):
+        # receive whatever has arrived; True if the frame changed
+        if time.monotonic() - self._hello_at > self.hello_every: self.hello()
+        changed = False
+        r, _w, _x = select.select([self.sock], [], [], timeout)
+        while r:
+            data = self.sock.recv(MAX_DATAGRAM)
+            changed |= self.apply(data)
+            r, _w, _x = select.select([self.sock], [], [], 0)
+        return changed
+
+    def apply(self, data):
+        magic, version, kind, w, h, seq, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION: return False
+        if kind == KEY:
+            self.w, self.h = w, h
+            self.frame = bytearray(data[HEADER.size:HEADER.size + w * h * 4])
+            self.keyframes += 1
+        else:
+            if self.seq is None or seq != (self.seq + 1) & 0xFFFFFFFF:
+                if self.seq is not None:
+                    self.gaps += 1
+                    self.seq = None
+                    self.hello()           # ask for a keyframe now
+                return False
+            for i, color in CELL.iter_unpack(data[HEADER.size:HEADER.size + count * CELL.size]):
+                self.frame[i * 4:i * 4 + 4] = color
+        self.seq = seq
+        self.frames += 1
+        return True
+
+    def render_ansi(self, flip_x=True):
+        # two characters per cell, 24-bit background color
+        lift = [int(255 * (v / 255) ** 0.5) for v in range(256)]   # LED levels are dim
+        lines = []
+        for y in range(self.h):
+            row = []
+            for x in range(self.w):
+                c = (y * self.w + (self.w - 1 - x if flip_x else x)) * 4
+                r, g, b, wh = self.frame[c:c + 4]
+                r, g, b = (lift[min(255, v + wh)] for v in (r, g, b))
+                row.append(f"\x1b[48;2;{r};{g};{b}m  ")
+            lines.append("".join(row) + "\x1b[0m")
+        return "\n".join(lines)
+
+def main():
+    ap = argparse.ArgumentParser(description="Watch a Snake kiosk's spectator stream")
+    ap.add_argument("host")
+    ap.add_argument("--port", type=int, default=9109)
+    ap.add_argument("--stats", action="store_true", help="print counters instead of drawing")
+    args = ap.parse_args()
+    v = StreamViewer(args.host, args.port)
+    v.hello()
+    t0 = time.monotonic()
+    try:
+        while True:
+            changed = v.poll()
+            if args.stats:
+                dt = max(1e-9, time.monotonic() - t0)
+                print(f"\rframes {v.frames} ({v.frames / dt:.1f}/s)  keyframes {v.keyframes}  gaps {v.gaps}", end="")
+            elif changed and v.frame is not None:
+                sys.stdout.write("\x1b[H" + v.render_ansi() + "\n")
+                sys.stdout.flush()
+    except KeyboardInterrupt:
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# snake_tournament.py (headless tournaments: many games of one policy + settings across all cores)
+# Every game runs the kiosk's own rules (snake_core.SnakeEngine) with a seed derived from the
+# base seed and the game's index, so a tournament gives the same results whatever the number
+# of workers or the chunk size. Workers play chunks of games and send back only counters;
+# the parent merges them as they arrive and prints a running total.
+#
+#   python snake_tournament.py --policy autopilot --games 20000
+#   python snake_tournament.py --policy greedy --walls --apples 3 --tick-ms 100 --round-seconds 120
+#   python snake_tournament.py --policy mybots:Cautious      # any module:class with choose(eng)
+#
+# A policy is a class built once per game as Policy(rng, cfg); choose(eng) is called before
+# every step and returns a direction from snake_core or None to keep going.
+import argparse, importlib, json, os, random, sys, time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from snake_core import SnakeEngine, DIRECTIONS, LEFT, next_cell
+
+# --- policies ---
+class StraightPolicy:
+    # never turns: a floor for comparisons
+    def __init__(self, rng, cfg): pass
+    def choose(self, eng): return None
+
+class RandomPolicy:
+    # turns at random now and then, like an inattentive player
+    def __init__(self, rng, cfg, p_turn=0.2):
+        self.rng, self.p_turn = rng, p_turn
+    def choose(self, eng):
+        return self.rng.choice(DIRECTIONS) if self.rng.random() < self.p_turn else None
+
+def _distance(eng, a, b):
+    (ay, ax), (by, bx) = divmod(a, eng.w), divmod(b, eng.w)
+    dx, dy = abs(ax - bx), abs(ay - by)
+    if not eng.walls_enabled: dx, dy = min(dx, eng.w - dx), min(dy, eng.h - dy)
+    return dx + dy
+
+class GreedyPolicy:
+    # one step toward the nearest apple that does not die right away; no look-ahead
+    def __init__(self, rng, cfg): pass
+    def choose(self, eng):
+        cur, body = eng.pending, eng.body
+        best = None
+        for d in DIRECTIONS:
+            if (d[0] + cur[0], d[1] + cur[1]) == (0, 0): continue
+            c = next_cell(eng, body.head(), d)
+            if c is None or (body.occ[c] and c != body.tail()): continue
+            dist = min((_distance(eng, c, f) for f in eng.foods), default=0)
+            key = (dist, d != cur)
+            if best is None or key < best[0]: best = (key, d)
+        return best[1] if best else None
+
+class AutopilotPolicy:
+    # the attract-mode player (snake_autopilot); an unlimited budget keeps results deterministic
+    def __init__(self, rng, cfg):
+        from snake_autopilot import Autopilot
+        budget = cfg["autopilot_budget_ms"]
+        self.pilot = Autopilot(budget / 1000 if budget else float("inf"))
+    def choose(self, eng): return self.pilot.plan(eng)
+
+POLICIES = {"straight": StraightPolicy, "random": RandomPolicy, "greedy": GreedyPolicy,
+            "autopilot": AutopilotPolicy}
+
+def load_policy(spec):
+    # a built-in name or "module:Class"
+    if spec in POLICIES: return POLICIES[spec]
+    mod, _, name = spec.partition(":")
+    if not name: raise ValueError(f"unknown policy {spec!r} (built-in: {', '.join(POLICIES)}; or module:Class)")
+    return getattr(importlib.import_module(mod), name)
+
+# --- playing ---
+def game_seed(base, i):
+    return random.Random(f"{base}:{i}").getrandbits(32)
+
+def max_ticks(cfg):
+    # a timed round at this tick speed lasts this many steps; untimed games get a safety cap
+    if cfg["round_seconds"]: return int(cfg["round_seconds"] * 1000 // cfg["tick_ms"])
+    return cfg["max_ticks"]
+
+def play_game(policy_cls, cfg, seed):
+    eng = SnakeEngine(cfg["w"], cfg["h"], walls_enabled=cfg["walls"], apples_total=cfg["apples"],
+                      rng=random.Random(seed))
+    policy = policy_cls(random.Random(seed ^ 0x5EED), cfg)
+    eng.start(LEFT, seed)
+    limit = max_ticks(cfg)
+    while eng.state == "running":
+        if eng.ticks >= limit:
+            eng.end_reason = "time" if cfg["round_seconds"] else "cap"
+            break
+        d = policy.choose(eng)
+        if d is not None: eng.turn(d)
+        eng.step()
+    return eng.score(), eng.ticks, eng.end_reason
+
+def play_chunk(cfg, first, count):
+    # worker: games first .. first + count - 1; returns counters only, never per-game lists
+    t0 = time.process_time()
+    policy_cls = load_policy(cfg["policy"])
+    scores, ticks, reasons = Counter(), Counter(), Counter()
+    for i in range(first, first + count):
+        score, n, reason = play_game(policy_cls, cfg, game_seed(cfg["seed"], i))
+        scores[score] += 1
+        ticks[n] += 1
+        reasons[reason or "?"] += 1
+    return scores, ticks, reasons, time.process_time() - t0
+
+# --- statistics ---
+def _percentile(hist, q):
+    # hist: value -> count
+    total = sum(hist.values())
+    if not total: return 0
+    want, seen = q * (total - 1), 0
+    for v in sorted(hist):
+        seen += hist[v]
+        if seen > want: return v
+    return max(hist)
+
+class TournamentStats:
+    def __init__(self):
+        self.scores, self.ticks, self.reasons = Counter(), Counter(), Counter()
+        self.games = 0
+        self.cpu_s = 0.0
+
+    def merge(self, scores, ticks, reasons, cpu_s):
+        self.scores.update(scores)
+        self.ticks.update(ticks)
+        self.reasons.update(reasons)
+        self.games += sum(reasons.values())
+        self.cpu_s += cpu_s
+
+    def summary(self, wall_s, workers):
+        g = max(1, self.games)
+        cores = min(workers, os.cpu_count() or 1)   # extra workers share the same cores
+        mean = lambda h: sum(v * n for v, n in h.items()) / g
+        return {
+            "games": self.games,
+            "seconds": round(wall_s, 3),
+            "games_per_s": round(self.games / max(wall_s, 1e-9), 1),
+            "games_per_s_per_core": round(self.games / max(wall_s, 1e-9) / cores, 1),
+            "games_per_cpu_s": round(self.games / max(self.cpu_s, 1e-9), 1),
+            "score": {"mean": round(mean(self.scores), 2), "max": max(self.scores, default=0),
+                      **{f"p{int(q * 100)}": _percentile(self.scores, q) for q in (0.5, 0.9, 0.99)}},
+            "ticks": {"mean": round(mean(self.ticks), 1), "max": max(self.ticks, default=0),
+                      "p50": _percentile(self.ticks, 0.5)},
+            "end_reasons": {r: round(n / g, 4) for r, n in self.reasons.most_common()},
+        }
+
+def score_histogram(scores, buckets=10, width=40):
+    if not scores: return []
+    top = max(scores)
+    size = max(1, -(-(top + 1) // buckets))
+    counts = Counter()
+    for v, n in scores.items(): counts[v // size] += n
+    peak = max(counts.values())
+    return [f"  {b * size:5d}-{b * size + size - 1:<5d} {counts[b]:8d} {'#' * (counts[b] * width // peak)}"
+            for b in range(max(counts) + 1)]
+
+def run(cfg, games, workers, chunk, progress=None):
+    stats = TournamentStats()
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_chunk, cfg, first, min(chunk, games - first))
+                   for first in range(0, games, chunk)]
+        for fut in as_completed(futures):
+            stats.merge(*fut.result())
+            if progress: progress(stats, time.perf_counter() - t0)
+    return stats, time.perf_counter() - t0
+
+def main():
+    ap = argparse.ArgumentParser(description="Play many headless Snake games with one policy and report statistics")
+    ap.add_argument("--policy", default="autopilot", help=f"{', '.join(POLICIES)} or module:Class")
+    ap.add_argument("--games", type=int, default=10000)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--chunk", type=int, default=100, help="games per task sent to a worker")
+    ap.add_argument("--seed", type=int, default=0, help="base seed; game i always gets the same board")
+    ap.add_argument("--size", default="16x16", help="board W x H")
+    ap.add_argument("--apples", type=int, default=1)
+    ap.add_argument("--walls", action="store_true")
+    ap.add_argument("--tick-ms", type=int, default=120, help="ms per step, as on the kiosk (sets the timed-round length)")
+    ap.add_argument("--round-seconds", type=int, default=0, help="timed rounds of this length; 0 = play until the game ends")
+    ap.add_argument("--max-ticks", type=int, default=5000, help="cap for untimed games that never end (reported as 'cap')")
+    ap.add_argument("--autopilot-budget-ms", type=float, default=0,
+                    help="planning time per step for the autopilot policy; 0 = unlimited (deterministic)")
+    ap.add_argument("--json", metavar="FILE", help="also write the summary as JSON")
+    args = ap.parse_args()
+
+    w, _, h = args.size.lower().partition("x")
+    cfg = {"policy": args.policy, "seed": args.seed, "w": int(w), "h": int(h or w), "apples": args.apples,
+           "walls": args.walls, "tick_ms": args.tick_ms, "round_seconds": args.round_seconds,
+           "max_ticks": args.max_ticks, "autopilot_budget_ms": args.autopilot_budget_ms}
+    if os.getcwd() not in sys.path: sys.path.insert(0, os.getcwd())   # module:Class next to the caller
+    try: load_policy(args.policy)   # fail here, not in every worker
+    except (ImportError, AttributeError, ValueError) as e: ap.error(str(e))
+    workers = max(1, args.workers)
+
+    def progress(stats, dt):
+        print(f"\r{stats.games}/{args.games} games  {stats.games / max(dt, 1e-9):,.0f}/s", end="", file=sys.stderr)
+
+    stats, dt = run(cfg, args.games, workers, max(1, args.chunk), progress)
+    print(file=sys.stderr)
+    s = stats.summary(dt, workers)
+    walls = "walls" if args.walls else "wrap"
+    timed = f", {args.round_seconds}s rounds @ {args.tick_ms} ms" if args.round_seconds else ""
+    print(f"{args.policy}: {s['games']} games on {cfg['w']}x{cfg['h']} ({walls}, {args.apples} apple(s){timed})")
+    print(f"{s['seconds']:.2f} s, {s['games_per_s']:,.0f} games/s on {workers} workers "
+          f"({s['games_per_s_per_core']:,.0f}/s per core used, {s['games_per_cpu_s']:,.0f} per CPU second)")
+    sc, tk = s["score"], s["ticks"]
+    print(f"score mean {sc['mean']}  p50 {sc['p50']}  p90 {sc['p90']}  p99 {sc['p99']}  max {sc['max']}")
+    print(f"ticks survived mean {tk['mean']}  p50 {tk['p50']}  max {tk['max']}")
+    print("end reasons: " + "  ".join(f"{r} {100 * v:.1f}%" for r, v in s["end_reasons"].items()))
+    print("score distribution:")
+    for line in score_histogram(stats.scores): print(line)
+    if args.json:
+        with open(args.json, "w") as f: json.dump({"settings": cfg, **s}, f, indent=1)
+
+if __name__ == "__main__":
+    main()